@@ -0,0 +1,103 @@
+"""
+Multi-core all-sources traversals over a shared-memory copy of a graph.
+
+batch_traverse copies the offsets, targets and weights arrays of a CSRGraph into
+multiprocessing.shared_memory blocks once. Every worker of a ProcessPoolExecutor
+attaches to those blocks when it starts and runs BFS or Dijkstra searches from the
+sources it is given, so no Vertex or Edge objects are pickled and every worker
+reads the same physical copy of the adjacency. Results are yielded as soon as
+each source finishes:
+
+    for source, paths in batch_traverse(followGraph, influencers):
+        ...
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from csr_graph import CSRGraph
+from shortest_paths import CSRShortestPaths
+import traversal
+
+_worker_graph = None
+_worker_blocks = []
+
+def _share(values, typecode):
+    if isinstance(values, array):
+        typecode = values.typecode
+    else:
+        values = array(typecode, values)
+    size = max(len(values) * values.itemsize, 1)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    block.buf[:len(values) * values.itemsize] = values.tobytes()
+    return block, (block.name, typecode, len(values))
+
+def _attach(spec):
+    name, typecode, length = spec
+    # Pool workers share the parent's resource tracker, so attaching here does not
+    # hand the block to a second tracker; the parent alone unlinks it.
+    block = shared_memory.SharedMemory(name=name)
+    _worker_blocks.append(block)
+    return block.buf[:length * array(typecode).itemsize].cast(typecode)
+
+def _init_worker(ids, specs, directed):
+    global _worker_graph
+    offsets, targets, weights = (_attach(spec) for spec in specs)
+    _worker_graph = CSRGraph(ids, offsets, targets, weights, directed)
+
+def _run(source, weighted, destinations):
+    if weighted:
+        paths = traversal.dijkstra(_worker_graph, source)
+    else:
+        paths = traversal.bfs(_worker_graph, source)
+    if destinations is not None:
+        return source, {destination: paths.distance_to(destination) for destination in destinations}
+    return source, paths.dist.tobytes(), paths.parent.tobytes()
+
+def batch_traverse(graph, sources, weighted=False, destinations=None, max_workers=None):
+    """
+    Runs a BFS or Dijkstra search from every source on a pool of worker processes.
+
+    Args:
+        graph (Graph or CSRGraph): The graph to search. A Graph is frozen first.
+        sources (list): The vertices to search from.
+        weighted (bool): Use Dijkstra's algorithm instead of breadth-first search.
+        destinations (list): When given, only the distances to these vertices are sent back.
+        max_workers (int): The number of worker processes. Defaults to the number of CPUs.
+
+    Yields:
+        tuple: (source, result) in completion order. The result is a CSRShortestPaths over graph,
+        or a dictionary mapping each destination to its distance when destinations is given.
+        Sources that are not in the graph are skipped.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    blocks = []
+    executor = None
+    try:
+        specs = []
+        for values, typecode in ((graph.offsets, 'q'), (graph.targets, 'q'), (graph.weights, 'd')):
+            block, spec = _share(values, typecode)
+            blocks.append(block)
+            specs.append(spec)
+        executor = ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                       initargs=(graph.ids, specs, graph.directed))
+        futures = [executor.submit(_run, source, weighted, destinations)
+                   for source in sources if source in graph.index]
+        for future in as_completed(futures):
+            result = future.result()
+            if destinations is not None:
+                yield result
+                continue
+            source, distances, parents = result
+            dist = array('d' if weighted else 'q')
+            dist.frombytes(distances)
+            parent = array('q')
+            parent.frombytes(parents)
+            yield source, CSRShortestPaths(graph, source, dist, parent, float('inf') if weighted else -1)
+    finally:
+        # A consumer that stops early only waits for the searches already running, not the queued ones.
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        for block in blocks:
+            block.close()
+            block.unlink()
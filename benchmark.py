@@ -0,0 +1,192 @@
+"""
+Benchmarks for Graph traversals and the social_network analytics.
+
+Every benchmark runs on seeded synthetic networks (see synthetic.py) for each
+combination of user count and average degree. Wall time is measured over
+several untraced runs, and peak memory in one extra run under tracemalloc.
+The results are written as JSON so runs from different commits can be compared.
+Progress and comparison lines go to stderr, so stdout holds only the JSON report:
+
+    python benchmark.py --users 1000 10000 --degrees 5 20 --output new.json
+    python benchmark.py --users 1000 10000 --degrees 5 20 --compare old.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import social_network
+from graph import Graph
+
+QUERIES = 20
+
+def _pairs(rng, names, count):
+    return [(rng.choice(names), rng.choice(names)) for _ in range(count)]
+
+def bench_add_edge(rng):
+    edges = [(u, v, w) for u, v, w in social_network.likeGraph.freeze().edges()]
+    def run():
+        graph = Graph()
+        for name in social_network.names:
+            graph.add_vertex(name)
+        for u, v, w in edges:
+            graph.add_edge(u, v, w)
+    return run
+
+def bench_bfs(rng):
+    sources = [rng.choice(social_network.names) for _ in range(QUERIES)]
+    return lambda: [social_network.followGraph.bfs(source) for source in sources]
+
+def bench_dijkstra(rng):
+    sources = [rng.choice(social_network.names) for _ in range(QUERIES)]
+    return lambda: [social_network.likeGraph.dijkstra(source) for source in sources]
+
+def bench_print_shortest_path(rng):
+    pairs = _pairs(rng, social_network.names, QUERIES)
+    trees = {start: social_network.likeGraph.dijkstra(start) for start, _ in pairs}
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for start, destination in pairs:
+                social_network.likeGraph.print_shortest_path(start, destination, trees[start])
+    return run
+
+def bench_calculate_engagement_rate(rng):
+    return lambda: [social_network.calculate_engagement_rate(name) for name in social_network.names]
+
+def bench_generate_influence_graph(rng):
+    return social_network.generate_influence_graph
+
+def bench_generate_influence_graph_batch(rng):
+    return social_network.generate_influence_graph_batch
+
+def bench_calculate_highest_engagement_path(rng):
+    social_network.generate_influence_graph_batch()
+    pairs = _pairs(rng, social_network.names, QUERIES)
+    # Without a time budget every run does the whole search, so runs stay comparable.
+    return lambda: [social_network.calculate_highest_engagement_path(start, destination, time_budget=float('inf'))
+                    for start, destination in pairs]
+
+BENCHMARKS = {
+    'graph.add_edge': bench_add_edge,
+    'graph.bfs': bench_bfs,
+    'graph.dijkstra': bench_dijkstra,
+    'graph.print_shortest_path': bench_print_shortest_path,
+    'social_network.calculate_engagement_rate': bench_calculate_engagement_rate,
+    'social_network.generate_influence_graph': bench_generate_influence_graph,
+    'social_network.generate_influence_graph_batch': bench_generate_influence_graph_batch,
+    'social_network.calculate_highest_engagement_path': bench_calculate_highest_engagement_path,
+}
+
+def measure(run, repeat):
+    """
+    Times a benchmark and records its peak traced memory.
+
+    Args:
+        run (callable): The benchmark body.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        dict: The fastest and mean wall time in seconds and the peak memory in bytes.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds_min': min(times), 'seconds_mean': sum(times) / len(times), 'peak_bytes': peak}
+
+def run_benchmarks(users, degrees, repeat=3, seed=0, only=None):
+    """
+    Runs every selected benchmark for every network size and degree.
+
+    Args:
+        users (list): The user counts to generate networks for.
+        degrees (list): The average degrees to generate networks for.
+        repeat (int): The number of timed runs per benchmark.
+        seed (int): The seed for the networks and the query vertices.
+        only (list): Substrings selecting the benchmarks to run. Runs all when omitted.
+
+    Returns:
+        list: One result dictionary per benchmark, size and degree.
+    """
+    results = []
+    for n_users in users:
+        for degree in degrees:
+            for name, bench in BENCHMARKS.items():
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                # Every benchmark gets a fresh network so earlier ones cannot affect it.
+                social_network.generate_synthetic_network(n_users, degree, seed)
+                edges = sum(len(social_network.likeGraph.get_edges(user)) for user in social_network.names)
+                run = bench(random.Random(seed))
+                result = {'benchmark': name, 'users': n_users, 'degree': degree, 'like_edges': edges,
+                          'repeat': repeat}
+                result.update(measure(run, repeat))
+                results.append(result)
+                print(f"{name} users={n_users} degree={degree}: {result['seconds_min']:.4f}s "
+                      f"peak={result['peak_bytes'] / 2 ** 20:.1f}MiB", file=sys.stderr)
+    return results
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """
+    Prints the change in fastest wall time and peak memory against an earlier run.
+
+    Args:
+        results (list): The new results.
+        baseline (list): The results of the earlier run.
+
+    Returns:
+        None
+    """
+    previous = {(r['benchmark'], r['users'], r['degree']): r for r in baseline}
+    for result in results:
+        old = previous.get((result['benchmark'], result['users'], result['degree']))
+        if old is None:
+            continue
+        time_change = result['seconds_min'] / old['seconds_min'] if old['seconds_min'] else float('inf')
+        memory_change = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('inf')
+        print(f"{result['benchmark']} users={result['users']} degree={result['degree']}: "
+              f"time x{time_change:.2f}, memory x{memory_change:.2f}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Graph traversals and social_network analytics.")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--degrees', type=float, nargs='+', default=[5, 20])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', help="Only run benchmarks whose name contains one of these strings")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--compare', help="Compare against the results in this JSON file")
+    args = parser.parse_args()
+    results = run_benchmarks(args.users, args.degrees, args.repeat, args.seed, args.only)
+    report = {'commit': _commit(), 'python': platform.python_version(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(results, json.load(file)['results'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import sys
+import neighborhood
+import traversal
+from array import array
+from bisect import bisect_left
+
+def load_numpy():
+    """
+    Imports NumPy on first use, so that importing the graph modules stays cheap.
+
+    Returns:
+        module: The numpy module, or None if NumPy is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def to_array(typecode, values):
+    """
+    Copies a sequence or NumPy array into an array.array.
+
+    Args:
+        typecode (str): The array typecode, e.g. 'q', 'i' or 'd'.
+        values (iterable): The values to copy.
+
+    Returns:
+        array: The copied values.
+    """
+    # A NumPy array can only be passed in once numpy is imported, so it is never imported here.
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(values, np.ndarray):
+        result = array(typecode)
+        result.frombytes(values.astype(typecode).tobytes())
+        return result
+    return array(typecode, values)
+
+class CSRGraph:
+    """
+    An immutable graph stored in compressed sparse row (CSR) form.
+
+    Vertex ids are interned to the integers 0..n-1. The outgoing edges of vertex i
+    are targets[offsets[i]:offsets[i + 1]] with the matching weights, sorted by
+    target so single edges can be found with a binary search. A CSRGraph is built
+    from an existing Graph with Graph.freeze or CSRGraph.from_graph, or directly from
+    edge arrays with CSRGraph.from_arrays.
+
+    Attributes:
+    - ids: A list (or other sequence) mapping each interned integer back to its vertex id.
+    - index: A dictionary mapping each vertex id to its interned integer, built on first use.
+    - offsets: An array of n + 1 row offsets into targets and weights.
+    - targets: An array with the interned destination of every edge.
+    - weights: An array with the weight of every edge.
+    - directed: A boolean indicating whether the source graph was directed.
+
+    Methods:
+    - from_graph: Builds a CSRGraph from a Graph.
+    - from_arrays: Builds a CSRGraph from parallel source, target and weight arrays.
+    - get_weight: Returns the weight of an edge between two vertices.
+    - get_number_of_edges: Returns the number of edges leaving a vertex.
+    - get_edges: Returns the edges leaving a vertex as a dictionary of destination to weight.
+    - edges: Iterates over all edges as (source, destination, weight) tuples.
+    - thaw: Returns a mutable Graph copy of the graph, optionally in the compact representation.
+    - transpose: Returns the graph with every edge reversed.
+    - bfs: Performs breadth-first search starting from a given vertex (see traversal.bfs).
+    - dijkstra: Performs Dijkstra's algorithm starting from a given vertex (see traversal.dijkstra).
+    - k_hop_neighborhood: Returns the vertices within k hops of a vertex with their hop counts, optionally
+      expanding large frontiers on worker threads (see neighborhood.k_hop_neighborhood).
+    - k_hop_count: Counts the vertices within k hops of a vertex (see neighborhood.k_hop_count).
+    - is_reachable: Checks whether a vertex is within k hops of another (see neighborhood.is_reachable).
+    """
+    def __init__(self, ids, offsets, targets, weights, directed=False):
+        self.ids = ids
+        self._index = None
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+
+    @classmethod
+    def from_graph(cls, graph, ids=None):
+        """
+        Builds a CSRGraph from the vertices and edges of a Graph.
+
+        Args:
+            graph (Graph): The graph to freeze.
+            ids (list): Optional vertex order. Graphs frozen with the same order share
+                their interned integers. Vertices missing from it are appended.
+
+        Returns:
+            CSRGraph: The frozen graph.
+        """
+        ids = list(graph.vertices) if ids is None else list(ids)
+        index = {id: i for i, id in enumerate(ids)}
+        for id in graph.vertices:
+            if id not in index:
+                index[id] = len(ids)
+                ids.append(id)
+        offsets = array('q', [0])
+        targets = array('i' if len(ids) < 2 ** 31 else 'q')
+        weights = array('d')
+        compact = getattr(graph, 'compact', False)
+        for id in ids:
+            vertex = graph.vertices.get(id)
+            if vertex is not None:
+                if compact:
+                    row = sorted((index[did], weight) for did, weight in vertex.weights.items())
+                else:
+                    row = sorted((index[did], edge.weight) for did, edge in vertex.edges.items())
+                for target, weight in row:
+                    targets.append(target)
+                    weights.append(weight)
+            offsets.append(len(targets))
+        return cls(ids, offsets, targets, weights, graph.directed)
+
+    @classmethod
+    def from_arrays(cls, ids, sources, targets, weights, directed=False):
+        """
+        Builds a CSRGraph from edges given as parallel arrays of interned ids.
+
+        Like Graph.add_edge, a later edge between the same pair replaces an earlier one,
+        and undirected graphs store every edge in both directions. NumPy arrays are
+        sorted with NumPy; other sequences are grouped in pure Python.
+
+        Args:
+            ids (list): The vertex ids; sources and targets index into it.
+            sources (sequence): The interned source of every edge.
+            targets (sequence): The interned destination of every edge.
+            weights (sequence): The weight of every edge.
+            directed (bool): Whether the edges are directed.
+
+        Returns:
+            CSRGraph: The graph.
+        """
+        n = len(ids)
+        target_type = 'i' if n < 2 ** 31 else 'q'
+        np = sys.modules.get('numpy')
+        if np is not None and isinstance(sources, np.ndarray):
+            sources = sources.astype(np.int64)
+            targets = np.asarray(targets, dtype=np.int64)
+            weights = np.asarray(weights, dtype=np.float64)
+            if not directed:
+                # Interleave each edge with its reverse to keep the edges in input order.
+                sources, targets = np.column_stack((sources, targets)).ravel(), np.column_stack((targets, sources)).ravel()
+                weights = np.repeat(weights, 2)
+            keys = sources * n + targets
+            order = np.argsort(keys)
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+            if len(order):
+                # Keep the latest edge (the largest input position) of every run of duplicates.
+                order = np.maximum.reduceat(order, starts)
+            sources, targets, weights = sources[order], targets[order], weights[order]
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+            return cls(list(ids), to_array('q', offsets), to_array(target_type, targets),
+                       to_array('d', weights), directed)
+        rows = [None] * n
+        for source, target, weight in zip(sources, targets, weights):
+            if rows[source] is None:
+                rows[source] = {}
+            rows[source][target] = weight
+            if not directed:
+                if rows[target] is None:
+                    rows[target] = {}
+                rows[target][source] = weight
+        offsets = array('q', [0])
+        row_targets = array(target_type)
+        row_weights = array('d')
+        for row in rows:
+            if row is not None:
+                for target, weight in sorted(row.items()):
+                    row_targets.append(target)
+                    row_weights.append(weight)
+            offsets.append(len(row_targets))
+        return cls(list(ids), offsets, row_targets, row_weights, directed)
+
+    @property
+    def index(self):
+        # Built on first use, so a graph that is only read by interned integer never decodes its ids.
+        if self._index is None:
+            self._index = {id: i for i, id in enumerate(self.ids)}
+        return self._index
+
+    def get_weight(self, user_id1, user_id2):
+        if user_id1 in self.index and user_id2 in self.index:
+            i = self.index[user_id1]
+            j = self.index[user_id2]
+            hi = self.offsets[i + 1]
+            k = bisect_left(self.targets, j, self.offsets[i], hi)
+            if k < hi and self.targets[k] == j:
+                return self.weights[k]
+        return 0
+
+    def get_number_of_edges(self, name):
+        if name in self.index:
+            i = self.index[name]
+            return self.offsets[i + 1] - self.offsets[i]
+        return 0
+
+    def get_edges(self, id):
+        if id in self.index:
+            i = self.index[id]
+            ids = self.ids
+            return {ids[self.targets[k]]: self.weights[k] for k in range(self.offsets[i], self.offsets[i + 1])}
+        return None
+
+    def edges(self):
+        ids = self.ids
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        for i in range(len(ids)):
+            for k in range(offsets[i], offsets[i + 1]):
+                yield ids[i], ids[targets[k]], weights[k]
+
+    def thaw(self, compact=False):
+        from graph import Graph
+        graph = Graph(compact)
+        for id in self.ids:
+            graph.add_vertex(id)
+        # Both directions of an undirected edge are already stored, so load them as directed edges.
+        graph.directed = True
+        graph.add_edges(self.edges())
+        graph.directed = self.directed
+        return graph
+
+    def transpose(self):
+        n = len(self.ids)
+        counts = array('q', [0]) * (n + 1)
+        for k in range(len(self.targets)):
+            counts[self.targets[k] + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        offsets = array('q', counts)
+        targets = array('i' if n < 2 ** 31 else 'q', [0]) * len(self.targets)
+        weights = array('d', [0]) * len(self.targets)
+        # Rows are visited in order, so every reversed row ends up sorted by target.
+        for i in range(n):
+            for k in range(self.offsets[i], self.offsets[i + 1]):
+                position = counts[self.targets[k]]
+                targets[position] = i
+                weights[position] = self.weights[k]
+                counts[self.targets[k]] += 1
+        return CSRGraph(self.ids, offsets, targets, weights, self.directed)
+
+    def bfs(self, start, target=None):
+        return traversal.bfs(self, start, target)
+
+    def dijkstra(self, start, target=None):
+        return traversal.dijkstra(self, start, target)
+
+    def k_hop_neighborhood(self, start, k, max_workers=None):
+        return neighborhood.k_hop_neighborhood(self, start, k, max_workers)
+
+    def k_hop_count(self, start, k=None, max_workers=None):
+        return neighborhood.k_hop_count(self, start, k, max_workers)
+
+    def is_reachable(self, start, dest, k=None, max_workers=None):
+        return neighborhood.is_reachable(self, start, dest, k, max_workers)
@@ -0,0 +1,138 @@
+import heapq
+from shortest_paths import ShortestPaths
+
+class DynamicShortestPaths(ShortestPaths):
+    """
+    A single-source shortest path tree that stays current as its graph changes.
+
+    The tree registers itself as a listener of the graph and repairs only the part
+    affected by each edge change, following Ramalingam and Reps:
+
+    - A new edge or a lower weight can only shorten paths through that edge, so a
+      Dijkstra search is started from its head and stops where nothing improves.
+    - A higher weight on an edge outside the tree changes nothing. On a tree edge,
+      only the subtree below it can get longer. Those vertices are reset, seeded
+      with their best distance through an edge from outside the subtree, and
+      settled again by a Dijkstra search limited to the subtree.
+
+    Call close when the tree is no longer needed so the graph stops notifying it.
+
+    Attributes:
+        graph (Graph): The graph the tree is kept current for.
+        source (any): The vertex the paths start from.
+        distances (dict): The distance from the source to every reached vertex.
+        parents (dict): The predecessor of every reached vertex (None for the source).
+        children (dict): The vertices whose parent is each vertex.
+    """
+
+    def __init__(self, graph, source):
+        super().__init__(source)
+        self.graph = graph
+        self.children = {}
+        graph.dijkstra(source, result=self)
+        for id, parent in self.parents.items():
+            if parent is not None:
+                self.children.setdefault(parent, set()).add(id)
+        graph.add_listener(self)
+
+    def close(self):
+        """
+        Stops keeping the tree current.
+
+        Returns:
+            None
+        """
+        self.graph.remove_listener(self)
+
+    def reset(self, source):
+        super().reset(source)
+        self.children = {}
+
+    def edge_updated(self, graph, user_id1, user_id2, old_weight, new_weight):
+        """
+        Repairs the tree after an edge was added or reweighted.
+
+        Args:
+            graph (Graph): The graph that changed.
+            user_id1 (any): The tail of the edge.
+            user_id2 (any): The head of the edge.
+            old_weight (number): The previous weight, or None for a new edge.
+            new_weight (number): The current weight.
+
+        Returns:
+            None
+        """
+        if old_weight is None or new_weight < old_weight:
+            self._decrease(user_id1, user_id2, new_weight)
+        elif new_weight > old_weight and self.parents.get(user_id2) == user_id1:
+            self._increase(user_id2)
+
+    def _set_parent(self, id, parent):
+        old_parent = self.parents.get(id)
+        if old_parent is not None:
+            self.children[old_parent].discard(id)
+        self.parents[id] = parent
+        if parent is not None:
+            self.children.setdefault(parent, set()).add(id)
+
+    def _decrease(self, user_id1, user_id2, weight):
+        if user_id1 not in self.distances:
+            return
+        distance = self.distances[user_id1] + weight
+        if distance >= self.distance_to(user_id2):
+            return
+        self.distances[user_id2] = distance
+        self._set_parent(user_id2, user_id1)
+        self._propagate([(distance, 0, user_id2)], None)
+
+    def _increase(self, root):
+        affected = []
+        stack = [root]
+        while stack:
+            id = stack.pop()
+            affected.append(id)
+            stack.extend(self.children.get(id, ()))
+        affected_set = set(affected)
+        self.children[self.parents[root]].discard(root)
+        for id in affected:
+            self.children.pop(id, None)
+            del self.parents[id]
+            del self.distances[id]
+        heap = []
+        count = 0
+        vertices = self.graph.vertices
+        for id in affected:
+            best, best_parent = None, None
+            for parent in self.graph.in_edges[id]:
+                if parent in affected_set or parent not in self.distances:
+                    continue
+                distance = self.distances[parent] + vertices[parent].edges[id].weight
+                if best is None or distance < best:
+                    best, best_parent = distance, parent
+            if best is not None:
+                self.distances[id] = best
+                self._set_parent(id, best_parent)
+                count += 1
+                heap.append((best, count, id))
+        heapq.heapify(heap)
+        self._propagate(heap, affected_set)
+
+    def _propagate(self, heap, limit):
+        # Runs Dijkstra's algorithm from the given entries. With a limit, only
+        # vertices in it can improve, so other vertices are not relaxed.
+        count = len(heap)
+        vertices = self.graph.vertices
+        distances = self.distances
+        while heap:
+            distance, _, uid = heapq.heappop(heap)
+            if distance > distances[uid]:
+                continue
+            for vid, edge in vertices[uid].edges.items():
+                if limit is not None and vid not in limit:
+                    continue
+                new_distance = distance + edge.weight
+                if vid not in distances or new_distance < distances[vid]:
+                    distances[vid] = new_distance
+                    self._set_parent(vid, uid)
+                    count += 1
+                    heapq.heappush(heap, (new_distance, count, vid))
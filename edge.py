@@ -1,4 +1,6 @@
 class Edge:
+    __slots__ = ('destination', 'weight')
+
     def __init__(self, destination, weight=1):
         self.destination = destination
         self.weight = weight
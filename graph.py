@@ -1,6 +1,14 @@
 import heapq
-from vertex import Vertex
-from edge import Edge
+import time
+from collections import deque
+import instrumentation
+import neighborhood
+from vertex import Vertex, CompactVertex, intern_id
+from shortest_paths import Path, ShortestPaths
+from csr_graph import CSRGraph
+
+# Compact graphs share one float object per distinct weight, up to this many weights.
+WEIGHT_POOL_SIZE = 4096
 
 class Graph:
     """
@@ -8,61 +16,175 @@ class Graph:
 
     Attributes:
     - vertices: A dictionary to store the vertices of the graph.
+    - in_edges: A dictionary mapping each vertex to the set of vertices with an edge to it (a list in
+      compact graphs).
+    - weighted_degree: A dictionary mapping each vertex to the total weight of its edges.
+    - in_weight: A dictionary mapping each vertex to the total weight of the edges pointing to it.
     - directed: A boolean indicating whether the graph is directed or not.
-    - path: A string representing the path of the graph.
+    - compact: A boolean indicating whether the graph uses the compact representation: CompactVertex
+      objects that store edge weights without Edge objects, interned string ids and shared weight
+      objects. get_edges then returns a read-only view, so weights must be changed with set_weight.
+    - version: A counter increased by every change to the vertices, edges or weights.
+    - listeners: Objects whose edge_updated(graph, user_id1, user_id2, old_weight, new_weight) method is
+      called after every stored edge change (old_weight is None for a new edge).
+    - path: A string with the vertices of the last path printed by print_shortest_path.
 
     Methods:
     - add_vertex: Adds a vertex to the graph.
     - add_edge: Adds an edge between two vertices in the graph.
+    - add_edges: Adds many (source, destination, weight) edges in one call, optionally adding to existing weights.
     - get_weight: Returns the weight of an edge between two vertices.
     - set_weight: Sets the weight of an edge between two vertices.
     - get_number_of_edges: Returns the number of edges connected to a vertex.
+    - get_weighted_degree: Returns the total weight of the edges connected to a vertex.
+    - get_in_degree: Returns the number of edges pointing to a vertex.
+    - get_in_weight: Returns the total weight of the edges pointing to a vertex.
     - display_number_of_edges: Displays the number of edges connected to each vertex.
     - display_edges: Displays all the edges in the graph.
     - get_edges: Returns the edges connected to a vertex.
-    - relax: Updates the distance and parent of a vertex during Dijkstra's algorithm.
-    - bfs: Performs breadth-first search starting from a given vertex.
-    - dijkstra: Performs Dijkstra's algorithm starting from a given vertex.
-    - print_shortest_path: Prints the shortest path from a start vertex to a destination vertex.
+    - add_listener: Registers an object to be notified of edge changes.
+    - remove_listener: Unregisters an edge change listener.
+    - get_in_edges: Returns the vertices with an edge to a vertex.
+    - relax: Updates the distance and parent of a vertex (kept for callers that manage Vertex state themselves).
+    - bfs: Performs breadth-first search starting from a given vertex and returns a ShortestPaths result.
+    - bidirectional_bfs: Finds a fewest-hop path between two vertices by searching from both ends.
+    - dijkstra: Performs Dijkstra's algorithm starting from a given vertex and returns a ShortestPaths result.
+      With a target it stops once the target is settled and keeps only the settled vertices.
+    - astar: Finds the shortest weighted path between two vertices with A* search, using landmark lower bounds.
+    - print_shortest_path: Prints the shortest path from a start vertex to a destination vertex using a
+      ShortestPaths result (a BFS from the start vertex if none is given), stores it in path and returns
+      the Path.
+    - k_hop_neighborhood: Returns the vertices within k hops of a vertex with their hop counts, expanding
+      one level at a time so only those vertices are visited (see neighborhood.k_hop_neighborhood).
+    - k_hop_count: Counts the vertices within k hops of a vertex (see neighborhood.k_hop_count).
+    - is_reachable: Checks whether a vertex is within k hops of another (see neighborhood.is_reachable).
+    - freeze: Returns an immutable CSRGraph copy of the graph.
     """
-    def __init__(self) -> None:
+    def __init__(self, compact=False) -> None:
         self.vertices = {}
+        self.in_edges = {}
+        self.weighted_degree = {}
+        self.in_weight = {}
         self.directed = False
+        self.compact = compact
+        self._weight_pool = {}
+        self.version = 0
+        self.listeners = []
         self.path = ''
 
     def add_vertex(self, id, data=None):
         if id in self.vertices:
             print("Vertex already in graph")
         else:
-            vertex = Vertex(id, data)
+            if self.compact:
+                id = intern_id(id)
+                vertex = CompactVertex(id, data)
+            else:
+                vertex = Vertex(id, data)
             self.vertices[id] = vertex
+            self.in_edges[id] = [] if self.compact else set()
+            self.weighted_degree[id] = 0
+            self.in_weight[id] = 0
+            self.version += 1
 
     def add_edge(self, user_id1, user_id2, weight=1):
         if user_id1 in self.vertices and user_id2 in self.vertices:
-            edge = Edge(user_id2, weight)
-            self.vertices[user_id1].add_edge(user_id2, edge)
+            if self.compact:
+                user_id1, user_id2 = intern_id(user_id1), intern_id(user_id2)
+            self._store_edge(user_id1, user_id2, weight)
             if not self.directed:
-                edge = Edge(user_id1, weight)
-                self.vertices[user_id2].add_edge(user_id1, edge)
+                self._store_edge(user_id2, user_id1, weight)
+
+    def add_edges(self, edges, accumulate=False):
+        started = time.perf_counter() if instrumentation.enabled else None
+        vertices = self.vertices
+        compact = self.compact
+        for user_id1, user_id2, weight in edges:
+            if user_id1 in vertices and user_id2 in vertices:
+                if compact:
+                    user_id1, user_id2 = intern_id(user_id1), intern_id(user_id2)
+                if accumulate:
+                    old_weight = vertices[user_id1].get_weight(user_id2)
+                    if old_weight is not None:
+                        weight += old_weight
+                self._store_edge(user_id1, user_id2, weight)
+                if not self.directed:
+                    self._store_edge(user_id2, user_id1, weight)
+        if started is not None:
+            instrumentation.observe('graph.add_edges', time.perf_counter() - started)
+
+    def _store_edge(self, user_id1, user_id2, weight):
+        vertex = self.vertices[user_id1]
+        old_weight = vertex.get_weight(user_id2)
+        if self.compact:
+            weight = self._shared_weight(weight)
+            vertex.set_weight(user_id2, weight)
+            if old_weight is None:
+                self.in_edges[user_id2].append(user_id1)
+        else:
+            vertex.set_weight(user_id2, weight)
+            self.in_edges[user_id2].add(user_id1)
+        self.weighted_degree[user_id1] += weight - (old_weight or 0)
+        self.in_weight[user_id2] += weight - (old_weight or 0)
+        self.version += 1
+        if instrumentation.enabled:
+            instrumentation.increment('graph.edges_stored')
+        for listener in self.listeners:
+            listener.edge_updated(self, user_id1, user_id2, old_weight, weight)
+
+    def _shared_weight(self, weight):
+        if type(weight) is not float:
+            return weight
+        if len(self._weight_pool) < WEIGHT_POOL_SIZE:
+            return self._weight_pool.setdefault(weight, weight)
+        return self._weight_pool.get(weight, weight)
 
     def get_weight(self, user_id1, user_id2):
         if user_id1 in self.vertices and user_id2 in self.vertices:
-            if user_id2 in self.vertices[user_id1].edges:
-                return self.vertices[user_id1].edges[user_id2].weight
+            weight = self.vertices[user_id1].get_weight(user_id2)
+            if weight is not None:
+                return weight
         return 0
 
     def set_weight(self, user_id1, user_id2, weight):
         if user_id1 in self.vertices and user_id2 in self.vertices:
             if user_id2 in self.vertices[user_id1].edges:
-                self.vertices[user_id1].edges[user_id2].weight = weight
+                self._store_weight(user_id1, user_id2, weight)
             if not self.directed and user_id1 in self.vertices[user_id2].edges:
-                self.vertices[user_id2].edges[user_id1].weight = weight
+                self._store_weight(user_id2, user_id1, weight)
+
+    def _store_weight(self, user_id1, user_id2, weight):
+        vertex = self.vertices[user_id1]
+        old_weight = vertex.get_weight(user_id2)
+        if self.compact:
+            weight = self._shared_weight(weight)
+        self.weighted_degree[user_id1] += weight - old_weight
+        self.in_weight[user_id2] += weight - old_weight
+        vertex.set_weight(user_id2, weight)
+        self.version += 1
+        for listener in self.listeners:
+            listener.edge_updated(self, user_id1, user_id2, old_weight, weight)
 
     def get_number_of_edges(self, name):
         if name in self.vertices:
             return len(self.vertices[name].edges)
         return 0
 
+    def get_weighted_degree(self, name):
+        if name in self.vertices:
+            return self.weighted_degree[name]
+        return 0
+
+    def get_in_degree(self, name):
+        if name in self.vertices:
+            return len(self.in_edges[name])
+        return 0
+
+    def get_in_weight(self, name):
+        if name in self.vertices:
+            return self.in_weight[name]
+        return 0
+
     def display_number_of_edges(self):
         for v in self.vertices:
             print(v, end=': ')
@@ -82,63 +204,210 @@ class Graph:
             return self.vertices[id].edges
         return None
 
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def get_in_edges(self, id):
+        if id in self.vertices:
+            return self.in_edges[id]
+        return None
+
     def relax(self, va, vb, w):
         if vb.distance > va.distance + w:
             vb.distance = va.distance + w
             vb.parent = va
 
-    def bfs(self, start):
+    def bfs(self, start, result=None):
         if start not in self.vertices:
             print("Starting vertex not found")
-            return
-        for v in self.vertices:
-            self.vertices[v].init_bfs()
-        queue = []
-        queue.append(self.vertices[start])
-        self.vertices[start].distance = 0
-        visited = set()
-        visited.add(start)
-        while len(queue) > 0:
-            vertex = queue.pop(0)
-            for e in vertex.edges:
-                did = vertex.edges[e].destination
-                destination = self.vertices[did]
-                if did not in visited:
-                    destination.parent = vertex
-                    destination.distance = vertex.distance + 1
-                    queue.append(destination)
-                    visited.add(did)
-
-    def dijkstra(self, start):
+            return None
+        if result is None:
+            result = ShortestPaths(start)
+        else:
+            result.reset(start)
+        track = instrumentation.enabled
+        if track:
+            started = time.perf_counter()
+            settled = peak = 0
+        distances = result.distances
+        parents = result.parents
+        distances[start] = 0
+        parents[start] = None
+        queue = deque([start])
+        while queue:
+            uid = queue.popleft()
+            for did in self.vertices[uid].edges:
+                if did not in distances:
+                    parents[did] = uid
+                    distances[did] = distances[uid] + 1
+                    queue.append(did)
+            if track:
+                settled += 1
+                peak = max(peak, len(queue))
+        if track:
+            instrumentation.record_search('graph.bfs', time.perf_counter() - started, settled,
+                                          len(distances) - 1, peak)
+        return result
+
+    def bidirectional_bfs(self, start, dest):
+        if start not in self.vertices or dest not in self.vertices:
+            return None
+        if start == dest:
+            return Path([start], 0)
+        # Forward parents point towards start, backward parents towards dest.
+        forward = {start: (None, 0)}
+        backward = {dest: (None, 0)}
+        forward_frontier = [start]
+        backward_frontier = [dest]
+        while forward_frontier and backward_frontier:
+            # Expand the smaller frontier by one whole level. The first level that
+            # meets the other side contains a shortest path, but not necessarily
+            # through the first meeting vertex found, so the level is finished.
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, seen, other = forward_frontier, forward, backward
+                neighbors = lambda uid: self.vertices[uid].edges
+            else:
+                frontier, seen, other = backward_frontier, backward, forward
+                neighbors = lambda uid: self.in_edges[uid]
+            next_frontier = []
+            meet = None
+            best = None
+            for uid in frontier:
+                depth = seen[uid][1] + 1
+                for vid in neighbors(uid):
+                    if vid not in seen:
+                        seen[vid] = (uid, depth)
+                        next_frontier.append(vid)
+                        if vid in other and (best is None or depth + other[vid][1] < best):
+                            meet = vid
+                            best = depth + other[vid][1]
+            if meet is not None:
+                path = []
+                vid = meet
+                while vid is not None:
+                    path.append(vid)
+                    vid = forward[vid][0]
+                path.reverse()
+                vid = backward[meet][0]
+                while vid is not None:
+                    path.append(vid)
+                    vid = backward[vid][0]
+                return Path(path, best)
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return None
+
+    def dijkstra(self, start, target=None, result=None):
         if start not in self.vertices:
             print(f"Vertex {start} not found in the graph.")
-            return
-        self.vertices[start].distance = 0
-        for v in self.vertices:
-            self.vertices[v].init_bfs()
-        self.vertices[start].distance = 0
-        Q = []
-        for vertex in self.vertices:
-            Q.append(self.vertices[vertex])
-        Q.sort(key=lambda x: x.distance)
-        while len(Q) > 0:
-            u = Q.pop(0)
-            for e in u.edges:
-                v = self.vertices[e]
-                w = u.edges[e].weight
-                self.relax(u, v, w)
-            Q.sort(key=lambda x: x.distance)
-
-    def print_shortest_path(self, start, dest):
+            return None
+        if result is None:
+            result = ShortestPaths(start)
+        else:
+            result.reset(start)
+        track = instrumentation.enabled
+        if track:
+            started = time.perf_counter()
+            settled = peak = 0
+        distances = result.distances
+        parents = result.parents
+        distances[start] = 0
+        parents[start] = None
+        # Entries are never removed from the heap when a distance improves;
+        # outdated entries are skipped when they are popped instead.
+        compact = self.compact
+        count = 0
+        heap = [(0, count, start)]
+        while heap:
+            distance, _, uid = heapq.heappop(heap)
+            if distance > distances[uid]:
+                continue
+            if uid == target:
+                # Vertices still queued at their current distance are not settled yet; leave them out.
+                for queued, _, vid in heap:
+                    if distances.get(vid) == queued:
+                        del distances[vid]
+                        del parents[vid]
+                break
+            vertex = self.vertices[uid]
+            for vid, edge in (vertex.weights if compact else vertex.edges).items():
+                new_distance = distance + (edge if compact else edge.weight)
+                if vid not in distances or new_distance < distances[vid]:
+                    distances[vid] = new_distance
+                    parents[vid] = uid
+                    count += 1
+                    heapq.heappush(heap, (new_distance, count, vid))
+            if track:
+                settled += 1
+                peak = max(peak, len(heap))
+        if track:
+            instrumentation.record_search('graph.dijkstra', time.perf_counter() - started, settled, count, peak)
+        return result
+
+    def astar(self, start, dest, landmarks=None):
+        if start not in self.vertices or dest not in self.vertices:
+            return None
+        heuristic = landmarks.heuristic(dest) if landmarks is not None else lambda id: 0
+        inf = float('inf')
+        compact = self.compact
+        distances = {start: 0}
+        parents = {start: None}
+        count = 0
+        heap = [(heuristic(start), 0, count, start)]
+        while heap:
+            _, distance, _, uid = heapq.heappop(heap)
+            if distance > distances[uid]:
+                continue
+            if uid == dest:
+                path = []
+                while uid is not None:
+                    path.append(uid)
+                    uid = parents[uid]
+                path.reverse()
+                return Path(path, distance)
+            vertex = self.vertices[uid]
+            for vid, edge in (vertex.weights if compact else vertex.edges).items():
+                new_distance = distance + (edge if compact else edge.weight)
+                if vid not in distances or new_distance < distances[vid]:
+                    bound = heuristic(vid)
+                    if bound == inf:
+                        continue
+                    distances[vid] = new_distance
+                    parents[vid] = uid
+                    count += 1
+                    heapq.heappush(heap, (new_distance + bound, new_distance, count, vid))
+        return None
+
+    def print_shortest_path(self, start, dest, paths=None):
         if dest not in self.vertices:
             print(f"Vertex {dest} not found in the graph.")
             return
-        start_vertex = self.vertices[start]
-        dest_vertex = self.vertices[dest]
-        if dest_vertex.parent is not None:
-            self.print_shortest_path(start, dest_vertex.parent.id)
-        elif dest != start:
+        if paths is None:
+            paths = self.bfs(start)
+            if paths is None:
+                return
+        path = paths.path_to(dest)
+        if path is None or path[0] != start:
             print("No path from start to dest")
-            return
-        print(str(dest), end=' ')
+            return None
+        self.path = ' '.join(str(id) for id in path)
+        print(self.path, end=' ')
+        return path
+
+    def k_hop_neighborhood(self, start, k):
+        return neighborhood.k_hop_neighborhood(self, start, k)
+
+    def k_hop_count(self, start, k=None):
+        return neighborhood.k_hop_count(self, start, k)
+
+    def is_reachable(self, start, dest, k=None):
+        return neighborhood.is_reachable(self, start, dest, k)
 
+    def freeze(self, ids=None):
+        return CSRGraph.from_graph(self, ids)
@@ -0,0 +1,124 @@
+"""
+Batch computation of the influence graph from the like, comment and follow graphs.
+
+The influence of v on u is (likes(u, v) + comments(u, v)) / engagement_rate(u),
+which is the like + comment matrix with every row u scaled by
+follows(u) / (total likes(u) + total comments(u)). When NumPy and SciPy are
+installed the whole matrix is computed with sparse matrix operations; otherwise
+the same row scaling is done one CSR row at a time in pure Python.
+"""
+from array import array
+from csr_graph import CSRGraph, load_numpy, to_array
+
+def _scipy():
+    # SciPy is imported on first use, like NumPy; it takes longer to import than the rest of the program.
+    numpy = load_numpy()
+    if numpy is None:
+        return None, None
+    try:
+        from scipy import sparse
+    except ImportError:
+        return None, None
+    return numpy, sparse
+
+def shared_ids(*graphs):
+    """
+    Returns one vertex order covering the vertices of every graph.
+
+    Args:
+        *graphs (Graph): The graphs whose vertices are combined, in order.
+
+    Returns:
+        list: The vertex ids, in order of first appearance.
+    """
+    ids = []
+    seen = set()
+    for graph in graphs:
+        for id in graph.vertices:
+            if id not in seen:
+                seen.add(id)
+                ids.append(id)
+    return ids
+
+def to_sparse_matrix(graph):
+    """
+    Wraps the arrays of a CSRGraph in a SciPy CSR matrix.
+
+    Args:
+        graph (CSRGraph): The graph to convert.
+
+    Returns:
+        scipy.sparse.csr_matrix: The n x n weighted adjacency matrix.
+    """
+    np, sparse = _scipy()
+    if sparse is None:
+        raise ImportError("to_sparse_matrix requires numpy and scipy")
+    n = len(graph.ids)
+    return sparse.csr_matrix(
+        (np.asarray(graph.weights, dtype=np.float64),
+         np.asarray(graph.targets),
+         np.asarray(graph.offsets)),
+        shape=(n, n))
+
+def compute_influence_matrix(like_graph, comment_graph, follow_graph):
+    """
+    Computes the influence of every user on every user they liked or commented on.
+
+    Self influence is left out. Users without follows or without any likes and
+    comments have an engagement rate of 0 and therefore an influence of 0.
+
+    Args:
+        like_graph (Graph): The likes between users.
+        comment_graph (Graph): The comments between users.
+        follow_graph (Graph): The follows between users.
+
+    Returns:
+        CSRGraph: The directed influence graph, sharing its vertex order with the like graph.
+    """
+    ids = shared_ids(like_graph, comment_graph, follow_graph)
+    likes = CSRGraph.from_graph(like_graph, ids)
+    comments = CSRGraph.from_graph(comment_graph, ids)
+    follows = CSRGraph.from_graph(follow_graph, ids)
+    if _scipy()[1] is not None:
+        return _compute_sparse(likes, comments, follows)
+    return _compute_rows(likes, comments, follows)
+
+def _compute_sparse(likes, comments, follows):
+    np, sparse = _scipy()
+    n = len(likes.ids)
+    engagement = (to_sparse_matrix(likes) + to_sparse_matrix(comments)).tocsr()
+    totals = np.asarray(engagement.sum(axis=1)).ravel()
+    follow_counts = np.diff(np.asarray(follows.offsets)).astype(np.float64)
+    scale = np.zeros(n)
+    mask = (totals != 0) & (follow_counts != 0)
+    scale[mask] = follow_counts[mask] / totals[mask]
+    # Scale the stored values in place so zero influence edges keep their entries.
+    engagement.data *= np.repeat(scale, np.diff(engagement.indptr))
+    influence = engagement.tocoo()
+    off_diagonal = influence.row != influence.col
+    influence = sparse.csr_matrix(
+        (influence.data[off_diagonal], (influence.row[off_diagonal], influence.col[off_diagonal])),
+        shape=(n, n))
+    influence.sort_indices()
+    return CSRGraph(likes.ids, to_array('q', influence.indptr),
+                    to_array(likes.targets.typecode, influence.indices),
+                    to_array('d', influence.data), True)
+
+def _compute_rows(likes, comments, follows):
+    offsets = array('q', [0])
+    targets = array(likes.targets.typecode)
+    weights = array('d')
+    for i in range(len(likes.ids)):
+        row = {}
+        for graph in (likes, comments):
+            for k in range(graph.offsets[i], graph.offsets[i + 1]):
+                row[graph.targets[k]] = row.get(graph.targets[k], 0) + graph.weights[k]
+        total = sum(row.values())
+        follow_count = follows.offsets[i + 1] - follows.offsets[i]
+        scale = follow_count / total if total != 0 and follow_count != 0 else 0
+        row.pop(i, None)
+        for target, weight in sorted(row.items()):
+            targets.append(target)
+            weights.append(weight * scale)
+        offsets.append(len(targets))
+    return CSRGraph(likes.ids, offsets, targets, weights, True)
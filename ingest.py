@@ -0,0 +1,182 @@
+"""
+Streaming bulk ingest of like, follow and comment events.
+
+Events are read from newline-delimited JSON or CSV files, one event per line:
+
+    {"type": "like", "source": "Alice", "destination": "Bob", "weight": 1}
+
+    type,source,destination,weight
+    like,Alice,Bob,1
+
+The weight is optional and defaults to 1. Events are parsed in chunks, the weights
+of repeated (source, destination) pairs are summed within a chunk, and each chunk
+is applied to the graphs with one Graph.add_edges call per graph before the next
+chunk is read, so memory use is bounded by the chunk size. Malformed lines and
+weights are counted as skipped events instead of stopping the ingest.
+"""
+import csv
+import json
+import time
+
+RELATIONS = {
+    'like': 'like', 'likes': 'like',
+    'follow': 'follow', 'follows': 'follow',
+    'comment': 'comment', 'comments': 'comment',
+}
+
+class IngestStats:
+    """
+    Counters describing a running or finished ingest.
+
+    Attributes:
+        events (int): The number of events read.
+        skipped (int): The number of events with an unknown type, a missing or non-string source or
+            destination, a malformed line or a weight that is not a number.
+        edges (int): The number of accumulated edge updates applied to the graphs.
+        seconds (float): The time spent so far.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.skipped = 0
+        self.edges = 0
+        self.seconds = 0.0
+
+    @property
+    def events_per_second(self):
+        return self.events / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return (f"IngestStats(events={self.events}, skipped={self.skipped}, edges={self.edges}, "
+                f"seconds={self.seconds:.3f}, events_per_second={self.events_per_second:.0f})")
+
+def _parse_weight(value):
+    if value is None or value == '':
+        return 1
+    weight = float(value)
+    return int(weight) if weight.is_integer() else weight
+
+def _json_events(file):
+    for line in file:
+        line = line.strip()
+        if line:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = None
+            if not isinstance(event, dict):
+                # Yielded without a type, so accumulate counts the line as skipped.
+                yield None, None, None, None
+                continue
+            yield event.get('type'), event.get('source'), event.get('destination'), event.get('weight')
+
+def _csv_events(file):
+    for row in csv.DictReader(file):
+        yield row.get('type'), row.get('source'), row.get('destination'), row.get('weight')
+
+def read_events(path, chunk_size=100000, format=None):
+    """
+    Reads an event file lazily, yielding lists of at most chunk_size events.
+
+    Args:
+        path (str): The file to read.
+        chunk_size (int): The maximum number of events per chunk.
+        format (str): 'json' or 'csv'. Guessed from the file extension when omitted.
+
+    Yields:
+        list: (type, source, destination, weight) tuples. Type and weight are not validated yet.
+    """
+    if format is None:
+        format = 'csv' if path.endswith('.csv') else 'json'
+    with open(path, newline='' if format == 'csv' else None, encoding='utf-8') as file:
+        events = _csv_events(file) if format == 'csv' else _json_events(file)
+        chunk = []
+        for event in events:
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def accumulate(events, stats=None):
+    """
+    Sums the weights of the events per relation and (source, destination) pair.
+
+    A repeated like or comment adds to the weight of the pair. A follow is either
+    there or not, so repeated follows keep a weight of 1.
+
+    Args:
+        events (list): (type, source, destination, weight) tuples.
+        stats (IngestStats): Optional counters to update.
+
+    Returns:
+        dict: A dictionary mapping 'like', 'follow' and 'comment' to {(source, destination): weight}.
+    """
+    totals = {'like': {}, 'follow': {}, 'comment': {}}
+    skipped = 0
+    for type, source, destination, weight in events:
+        relation = RELATIONS.get(type) if isinstance(type, str) else None
+        # Users are named by non-empty strings; JSON numbers, lists or objects are not user ids.
+        if (relation is None or not isinstance(source, str) or not isinstance(destination, str)
+                or not source or not destination):
+            skipped += 1
+            continue
+        pairs = totals[relation]
+        key = (source, destination)
+        if relation == 'follow':
+            pairs[key] = 1
+            continue
+        try:
+            weight = _parse_weight(weight)
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+        pairs[key] = pairs.get(key, 0) + weight
+    if stats is not None:
+        stats.events += len(events)
+        stats.skipped += skipped
+    return totals
+
+def _add_missing_vertices(pairs, graphs):
+    for source, destination in pairs:
+        for id in (source, destination):
+            for graph in graphs:
+                if id not in graph.vertices:
+                    graph.add_vertex(id)
+
+def load_events(paths, graphs, vertex_graphs=None, chunk_size=100000, format=None, progress=None):
+    """
+    Streams event files into graphs in bulk batches.
+
+    Args:
+        paths (list): The event files to read, in order.
+        graphs (dict): A dictionary mapping 'like', 'follow' and 'comment' to the Graph receiving those events.
+        vertex_graphs (list): The graphs that users seen for the first time are added to.
+            Defaults to the graphs in graphs.
+        chunk_size (int): The number of events parsed and applied per batch.
+        format (str): 'json' or 'csv' for every file. Guessed per file when omitted.
+        progress (callable): Called with the IngestStats after every batch.
+
+    Returns:
+        IngestStats: The final counters, including the throughput in events per second.
+    """
+    vertex_graphs = list(graphs.values()) if vertex_graphs is None else list(vertex_graphs)
+    stats = IngestStats()
+    started = time.perf_counter()
+    for path in paths:
+        for chunk in read_events(path, chunk_size, format):
+            totals = accumulate(chunk, stats)
+            for relation, pairs in totals.items():
+                graph = graphs.get(relation)
+                if graph is None or not pairs:
+                    continue
+                _add_missing_vertices(pairs, vertex_graphs if graph in vertex_graphs else vertex_graphs + [graph])
+                graph.add_edges(((source, destination, weight) for (source, destination), weight in pairs.items()),
+                                accumulate=relation != 'follow')
+                stats.edges += len(pairs)
+            stats.seconds = time.perf_counter() - started
+            if progress is not None:
+                progress(stats)
+    stats.seconds = time.perf_counter() - started
+    return stats
@@ -0,0 +1,344 @@
+"""
+Opt-in counters, timers and sampled profiles for Graph and social_network.
+
+Nothing is recorded until enable is called. While disabled, Graph traversals
+only test one local flag per settled vertex, and the functions decorated with
+timed are the undecorated functions themselves, so they cost nothing. enable
+replaces them in their modules with timing wrappers and disable puts the
+originals back. Once enabled:
+
+    import instrumentation
+    instrumentation.enable(sample_rate=0.01, profile_dir='profiles')
+    ...
+    instrumentation.write_json('metrics.json')
+    instrumentation.write_prometheus('metrics.prom')
+    instrumentation.serve(9464)    # http://127.0.0.1:9464/metrics
+
+Counters only grow, peaks keep the largest value seen and timers keep the call
+count, total and maximum seconds. With a sample rate, that fraction of the
+timed calls runs under cProfile. The profiles are kept in memory (see profiles)
+and, with a profile directory, written there as .prof files for pstats.
+"""
+import cProfile
+import functools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+PREFIX = 'social_x'
+
+enabled = False
+_sample_rate = 0.0
+_profile_dir = None
+
+_lock = threading.Lock()
+_profile_lock = threading.Lock()
+_counters = {}
+_peaks = {}
+_timers = {}
+_profiles = deque(maxlen=32)
+_started = time.time()
+# (module name, attribute, function, timing wrapper) for every function decorated with timed.
+_timed = []
+
+def enable(sample_rate=0.0, profile_dir=None):
+    """
+    Starts recording metrics.
+
+    Args:
+        sample_rate (float): The fraction of timed calls to run under cProfile.
+        profile_dir (str): The directory to write sampled profiles to. They are only kept in memory when omitted.
+
+    Returns:
+        None
+    """
+    global enabled, _sample_rate, _profile_dir
+    _sample_rate = sample_rate
+    _profile_dir = profile_dir
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    enabled = True
+    _install(True)
+
+def disable():
+    """
+    Stops recording metrics. The recorded values are kept.
+
+    Returns:
+        None
+    """
+    global enabled
+    enabled = False
+    _install(False)
+
+def _install(wrapped):
+    for module_name, attribute, func, wrapper in _timed:
+        module = sys.modules.get(module_name)
+        current = getattr(module, attribute, None)
+        if current is func or current is wrapper:
+            setattr(module, attribute, wrapper if wrapped else func)
+
+def reset():
+    """
+    Drops every recorded metric and profile.
+
+    Returns:
+        None
+    """
+    global _started
+    with _lock:
+        _counters.clear()
+        _peaks.clear()
+        _timers.clear()
+        _profiles.clear()
+        _started = time.time()
+
+def increment(name, value=1):
+    """
+    Adds to a counter.
+
+    Args:
+        name (str): The counter name, e.g. 'graph.edges_stored'.
+        value (number): The amount to add.
+
+    Returns:
+        None
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def record_peak(name, value):
+    """
+    Raises a peak value to value if it is larger.
+
+    Args:
+        name (str): The peak name, e.g. 'graph.dijkstra.queue_peak'.
+        value (number): The observed value.
+
+    Returns:
+        None
+    """
+    with _lock:
+        if value > _peaks.get(name, value - 1):
+            _peaks[name] = value
+
+def observe(name, seconds):
+    """
+    Records one timed call.
+
+    Args:
+        name (str): The timer name, e.g. 'social_network.calculate_engagement_rate'.
+        seconds (float): The duration of the call.
+
+    Returns:
+        None
+    """
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+def record_search(kind, seconds, settled, relaxed, queue_peak):
+    """
+    Records the work done by one graph search.
+
+    Args:
+        kind (str): The search, e.g. 'graph.bfs' or 'graph.dijkstra'.
+        seconds (float): The duration of the search.
+        settled (int): The number of vertices whose edges were scanned.
+        relaxed (int): The number of edges that improved a distance.
+        queue_peak (int): The largest size of the queue or heap.
+
+    Returns:
+        None
+    """
+    observe(kind, seconds)
+    increment(kind + '.settled', settled)
+    increment(kind + '.relaxed', relaxed)
+    record_peak(kind + '.queue_peak', queue_peak)
+
+def timed(name=None):
+    """
+    Returns a decorator that times every call of a module-level function while recording is enabled.
+
+    While disabled the decorator returns the function unchanged. enable swaps the timing wrapper
+    into the function's module, so calls through the module (including calls from inside it) are
+    timed. References taken with 'from module import function' keep what they got at import time.
+
+    Args:
+        name (str): The timer name. Defaults to the module and name of the function.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(func):
+        timer = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            if _sample_rate and random.random() < _sample_rate and _profile_lock.acquire(blocking=False):
+                # Only one profiler can be active at a time, so nested or concurrent calls are not sampled.
+                try:
+                    return _profiled(timer, func, args, kwargs)
+                finally:
+                    _profile_lock.release()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(timer, time.perf_counter() - started)
+        _timed.append((func.__module__, func.__name__, func, wrapper))
+        return wrapper if enabled else func
+    return decorator
+
+def _profiled(timer, func, args, kwargs):
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - started
+        observe(timer, seconds)
+        increment('instrumentation.profiles')
+        path = None
+        if _profile_dir:
+            path = os.path.join(_profile_dir, f"{timer}-{time.time_ns()}.prof")
+            profiler.dump_stats(path)
+        with _lock:
+            _profiles.append({'name': timer, 'seconds': seconds, 'path': path, 'profile': profiler})
+
+def profiles():
+    """
+    Returns the most recent sampled profiles.
+
+    Returns:
+        list: Dictionaries with the timer name, the duration in seconds, the .prof file path (or None)
+        and the cProfile.Profile, which can be passed to pstats.Stats.
+    """
+    with _lock:
+        return list(_profiles)
+
+def snapshot():
+    """
+    Returns the recorded metrics.
+
+    Returns:
+        dict: The counters, peaks and timers (count, total, mean and max seconds), and the seconds
+        since recording started or was reset.
+    """
+    with _lock:
+        timers = {name: {'count': count, 'seconds_total': total, 'seconds_mean': total / count,
+                         'seconds_max': longest}
+                  for name, (count, total, longest) in _timers.items()}
+        return {'enabled': enabled, 'uptime_seconds': time.time() - _started, 'counters': dict(_counters),
+                'peaks': dict(_peaks), 'timers': timers}
+
+def _metric_name(name, suffix=''):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', f"{PREFIX}_{name}{suffix}")
+
+def to_prometheus():
+    """
+    Returns the recorded metrics in the Prometheus text exposition format.
+
+    Counters become <name>_total counters, peaks become gauges and timers become summaries
+    with <name>_seconds_count and <name>_seconds_sum plus a <name>_seconds_max gauge.
+
+    Returns:
+        str: The metrics.
+    """
+    metrics = snapshot()
+    lines = []
+    for name, value in sorted(metrics['counters'].items()):
+        metric = _metric_name(name, '_total')
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, value in sorted(metrics['peaks'].items()):
+        metric = _metric_name(name)
+        lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    for name, timer in sorted(metrics['timers'].items()):
+        metric = _metric_name(name, '_seconds')
+        lines += [f"# TYPE {metric} summary", f"{metric}_count {timer['count']}",
+                  f"{metric}_sum {timer['seconds_total']}",
+                  f"# TYPE {metric}_max gauge", f"{metric}_max {timer['seconds_max']}"]
+    return '\n'.join(lines) + '\n'
+
+def _write(path, text):
+    # Write next to the target and rename, so a scraper never reads a partial file.
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+def write_json(path):
+    """
+    Writes the recorded metrics to a JSON file.
+
+    Args:
+        path (str): The file to write.
+
+    Returns:
+        None
+    """
+    _write(path, json.dumps(snapshot(), indent=2))
+
+def write_prometheus(path):
+    """
+    Writes the recorded metrics to a Prometheus text file, e.g. for the node exporter textfile collector.
+
+    Args:
+        path (str): The file to write.
+
+    Returns:
+        None
+    """
+    _write(path, to_prometheus())
+
+def serve(port=9464, host='127.0.0.1'):
+    """
+    Serves the metrics over HTTP from a background thread.
+
+    /metrics returns the Prometheus text format and /metrics.json the JSON snapshot.
+
+    Args:
+        port (int): The port to listen on. 0 picks a free port.
+        host (str): The address to listen on. Defaults to the local machine only.
+
+    Returns:
+        ThreadingHTTPServer: The server. Call its shutdown method to stop it.
+    """
+    # http.server is imported here because importing it takes longer than the rest of this module.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = to_prometheus(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = json.dumps(snapshot()), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
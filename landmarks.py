@@ -0,0 +1,188 @@
+"""
+Landmark (ALT) lower bounds for A* shortest path queries.
+
+A LandmarkIndex stores, for a few landmark vertices L, the distance from L to
+every vertex and from every vertex to L. By the triangle inequality
+
+    d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+
+so the largest of these differences is a lower bound on the remaining distance
+from v to the target t. Graph.astar and traversal.astar use it to steer the
+search towards the target, settling far fewer vertices than Dijkstra's algorithm.
+The bounds are only valid for the graph they were built from: rebuild the index
+after edges are added or their weights change.
+"""
+import random
+import struct
+from array import array
+from csr_graph import CSRGraph
+import traversal
+
+MAGIC = b'SXALT\0\0\0'
+VERSION = 1
+HEADER = struct.Struct('=8sIIQQ')
+FLAG_DIRECTED = 1
+
+class LandmarkIndex:
+    """
+    Distance tables for a set of landmark vertices.
+
+    Attributes:
+        ids (list): The vertex ids in the interned order of the graph the index was built from.
+        index (dict): A dictionary mapping each vertex id to its interned integer.
+        landmarks (list): The interned landmark vertices.
+        forward (list): One array per landmark with its distance to every vertex.
+        backward (list): One array per landmark with the distance from every vertex to it.
+            It is the same list as forward for undirected graphs.
+        directed (bool): Whether the graph was directed.
+    """
+
+    def __init__(self, ids, landmarks, forward, backward, directed):
+        self.ids = ids
+        self.index = {id: i for i, id in enumerate(ids)}
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.directed = directed
+
+    @classmethod
+    def build(cls, graph, count=8, seed=0):
+        """
+        Picks landmarks and computes their distance tables.
+
+        The first landmark is a random vertex. Every further landmark is the vertex farthest
+        from the landmarks chosen so far, which spreads the landmarks over the graph. Once every
+        reachable vertex is covered, a vertex with edges that no landmark reaches is picked.
+
+        Args:
+            graph (Graph or CSRGraph): The graph to index. A Graph is frozen first.
+            count (int): The number of landmarks.
+            seed (int): The seed for the first landmark.
+
+        Returns:
+            LandmarkIndex: The index.
+        """
+        if not isinstance(graph, CSRGraph):
+            graph = graph.freeze()
+        n = len(graph.ids)
+        reverse = graph.transpose() if graph.directed else None
+        landmarks = []
+        forward = []
+        backward = []
+        inf = float('inf')
+        nearest = array('d', [inf]) * n
+        candidate = random.Random(seed).randrange(n) if n else None
+        while candidate is not None and len(landmarks) < count:
+            landmarks.append(candidate)
+            distances = traversal.dijkstra(graph, graph.ids[candidate]).dist
+            forward.append(distances)
+            if reverse is not None:
+                backward.append(traversal.dijkstra(reverse, graph.ids[candidate]).dist)
+            candidate = None
+            unreached = None
+            farthest = 0
+            for v in range(n):
+                if distances[v] < nearest[v]:
+                    nearest[v] = distances[v]
+                if nearest[v] == inf:
+                    if unreached is None and graph.offsets[v + 1] > graph.offsets[v]:
+                        unreached = v
+                elif nearest[v] > farthest:
+                    candidate, farthest = v, nearest[v]
+            if candidate is None:
+                candidate = unreached
+        return cls(graph.ids, landmarks, forward, backward if graph.directed else forward, graph.directed)
+
+    def lower_bound(self, v, t):
+        """
+        Returns a lower bound on the distance between two interned vertices.
+
+        Args:
+            v (int): The interned vertex the distance starts from.
+            t (int): The interned target vertex.
+
+        Returns:
+            float: The bound, or infinity if the landmarks prove that t cannot be reached from v.
+        """
+        inf = float('inf')
+        bound = 0
+        for forward, backward in zip(self.forward, self.backward):
+            to_v, to_t = forward[v], forward[t]
+            if to_v != inf:
+                if to_t == inf:
+                    return inf
+                if to_t - to_v > bound:
+                    bound = to_t - to_v
+            from_v, from_t = backward[v], backward[t]
+            if from_t != inf:
+                if from_v == inf:
+                    return inf
+                if from_v - from_t > bound:
+                    bound = from_v - from_t
+        return bound
+
+    def heuristic(self, target):
+        """
+        Returns the A* heuristic towards a target as a function of a vertex id.
+
+        Args:
+            target (any): The identifier of the target vertex.
+
+        Returns:
+            callable: A function mapping a vertex id to a lower bound on its distance to the target.
+        """
+        t = self.index[target]
+        index = self.index
+        return lambda id: self.lower_bound(index[id], t) if id in index else 0
+
+    def save(self, path):
+        """
+        Writes the landmark tables to a file, e.g. next to the graph snapshot they belong to.
+
+        Args:
+            path (str): The file to write.
+
+        Returns:
+            None
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, FLAG_DIRECTED if self.directed else 0,
+                                   len(self.ids), len(self.landmarks)))
+            file.write(array('q', self.landmarks))
+            for distances in self.forward:
+                file.write(array('d', distances))
+            if self.directed:
+                for distances in self.backward:
+                    file.write(array('d', distances))
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+        Reads landmark tables written by save.
+
+        Args:
+            path (str): The file to read.
+            graph (CSRGraph): The graph the tables were built for, which supplies the vertex ids.
+
+        Returns:
+            LandmarkIndex: The index.
+        """
+        with open(path, 'rb') as file:
+            magic, version, flags, n, count = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a landmark file")
+            if version != VERSION:
+                raise ValueError(f"Unsupported landmark file version {version} in {path}")
+            if n != len(graph.ids):
+                raise ValueError(f"{path} was built for a graph with {n} vertices, not {len(graph.ids)}")
+            landmarks = array('q')
+            landmarks.fromfile(file, count)
+            forward = []
+            backward = []
+            for tables in (forward, backward) if flags & FLAG_DIRECTED else (forward,):
+                for _ in range(count):
+                    distances = array('d')
+                    distances.fromfile(file, n)
+                    tables.append(distances)
+        directed = bool(flags & FLAG_DIRECTED)
+        return cls(graph.ids, list(landmarks), forward, backward if directed else forward, directed)
@@ -0,0 +1,208 @@
+"""
+Incrementally maintained top-k rankings of users.
+
+A Leaderboard keeps every user ordered by score in a list of sorted chunks, so
+changing one score is a binary search plus an insert into a chunk of at most
+2 * CHUNK (1024) entries, and the top k users are read off the front in O(k).
+
+InfluenceLeaderboard ranks the users of an influence graph by the total
+influence they have on others, which is the weight of their incoming edges.
+EngagementLeaderboard ranks users by engagement rate. Both register as
+listeners of their graphs and update the affected users on every edge change:
+
+    board = InfluenceLeaderboard(social_network.influenceGraph)
+    board.top(100)
+"""
+from bisect import bisect_left, insort
+
+class Leaderboard:
+    """
+    Users ordered by descending score, with ties ordered by id.
+
+    Attributes:
+        scores (dict): The current score of every ranked user.
+    """
+
+    CHUNK = 512
+
+    def __init__(self, scores=None):
+        self.scores = {}
+        self._chunks = []
+        self._maxes = []
+        if scores:
+            self.scores = dict(scores)
+            keys = sorted((-score, id) for id, score in self.scores.items())
+            self._chunks = [keys[i:i + self.CHUNK] for i in range(0, len(keys), self.CHUNK)]
+            self._maxes = [chunk[-1] for chunk in self._chunks]
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, id):
+        return id in self.scores
+
+    def update(self, id, score):
+        """
+        Sets the score of a user, adding the user if needed.
+
+        Args:
+            id (any): The user.
+            score (number): The new score.
+
+        Returns:
+            None
+        """
+        old_score = self.scores.get(id)
+        if old_score is not None:
+            if old_score == score:
+                return
+            self._remove((-old_score, id))
+        self.scores[id] = score
+        self._insert((-score, id))
+
+    def remove(self, id):
+        """
+        Removes a user from the ranking.
+
+        Args:
+            id (any): The user.
+
+        Returns:
+            None
+        """
+        if id in self.scores:
+            self._remove((-self.scores.pop(id), id))
+
+    def top(self, k=100):
+        """
+        Returns the users with the highest scores.
+
+        Args:
+            k (int): The number of users.
+
+        Returns:
+            list: Up to k (user, score) tuples, highest score first.
+        """
+        result = []
+        for chunk in self._chunks:
+            for negative_score, id in chunk:
+                if len(result) >= k:
+                    return result
+                result.append((id, -negative_score))
+        return result
+
+    def rank(self, id):
+        """
+        Returns the position of a user in the ranking.
+
+        Args:
+            id (any): The user.
+
+        Returns:
+            int: The zero-based rank, or None if the user is not ranked.
+        """
+        if id not in self.scores:
+            return None
+        key = (-self.scores[id], id)
+        i = bisect_left(self._maxes, key)
+        return sum(len(chunk) for chunk in self._chunks[:i]) + bisect_left(self._chunks[i], key)
+
+    def _insert(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        i = min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * self.CHUNK:
+            self._chunks[i:i + 1] = [chunk[:self.CHUNK], chunk[self.CHUNK:]]
+            self._maxes[i:i + 1] = [chunk[self.CHUNK - 1], chunk[-1]]
+
+    def _remove(self, key):
+        i = bisect_left(self._maxes, key)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+class InfluenceLeaderboard(Leaderboard):
+    """
+    Users ranked by the total weight of their incoming edges in an influence graph.
+
+    Users without incoming edges are ranked with a score of 0. Users added to the graph
+    later are ranked once their first incoming edge is added.
+
+    Attributes:
+        graph (Graph): The influence graph.
+    """
+
+    def __init__(self, graph):
+        super().__init__(graph.in_weight)
+        self.graph = graph
+        graph.add_listener(self)
+
+    def close(self):
+        """
+        Stops updating the ranking.
+
+        Returns:
+            None
+        """
+        self.graph.remove_listener(self)
+
+    def edge_updated(self, graph, user_id1, user_id2, old_weight, new_weight):
+        self.update(user_id2, graph.in_weight[user_id2])
+
+class EngagementLeaderboard(Leaderboard):
+    """
+    Users ranked by engagement rate: the weight of their likes and comments divided by their follows,
+    or 0 for users who follow no one (see social_network.calculate_engagement_rate).
+
+    Attributes:
+        likes (Graph): The like graph.
+        comments (Graph): The comment graph.
+        follows (Graph): The follow graph.
+    """
+
+    def __init__(self, likes, comments, follows):
+        self.likes = likes
+        self.comments = comments
+        self.follows = follows
+        super().__init__({name: self.engagement_rate(name) for name in likes.vertices})
+        for graph in (likes, comments, follows):
+            graph.add_listener(self)
+
+    def close(self):
+        """
+        Stops updating the ranking.
+
+        Returns:
+            None
+        """
+        for graph in (self.likes, self.comments, self.follows):
+            graph.remove_listener(self)
+
+    def engagement_rate(self, name):
+        """
+        Computes the engagement rate of a user from the graphs.
+
+        Args:
+            name (any): The user.
+
+        Returns:
+            float: The engagement rate.
+        """
+        follows = self.follows.get_number_of_edges(name)
+        if follows == 0:
+            return 0
+        return (self.likes.get_weighted_degree(name) + self.comments.get_weighted_degree(name)) / follows
+
+    def edge_updated(self, graph, user_id1, user_id2, old_weight, new_weight):
+        # Only the outgoing likes, comments and follows of user_id1 changed.
+        if user_id1 in self.likes.vertices:
+            self.update(user_id1, self.engagement_rate(user_id1))
@@ -0,0 +1,314 @@
+"""
+One graph holding several relations (likes, follows, comments, ...) over a
+single vertex set.
+
+social_network keeps one Graph per relation, so every user has a Vertex and an
+adjacency dictionary per relation, and every edge an Edge object per relation.
+A MultiplexGraph interns every vertex id once and stores each row of edges
+once: a sorted array of destinations plus one weight column per relation,
+with a weight of 0 meaning the relation has no such edge. Searches combine the
+columns on the fly, so one traversal can follow any mix of relations:
+
+    multiplex = MultiplexGraph.from_graphs({'likes': likeGraph, 'follows': followGraph,
+                                            'comments': commentGraph})
+    multiplex.dijkstra('Alice', 'likes')
+    multiplex.dijkstra('Alice', {'likes': 1, 'comments': 2})
+    multiplex.dijkstra('Alice', lambda likes, follows, comments: 1 / (likes + comments) if likes + comments else None)
+
+Per-relation aggregates (total weight and edge count of every vertex) are kept
+in dense arrays, so metrics that combine relations, such as the engagement
+rate, are single passes over those arrays.
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import deque
+from csr_graph import CSRGraph
+from shortest_paths import CSRShortestPaths
+from vertex import intern_id
+
+RELATIONS = ('likes', 'follows', 'comments')
+
+class MultiplexGraph:
+    """
+    A graph with a weight column per relation on a shared edge list.
+
+    Attributes:
+    - relations: The relation names, in column order.
+    - ids: A list mapping each interned integer back to its vertex id.
+    - index: A dictionary mapping each vertex id to its interned integer.
+    - targets: One sorted array per vertex with the interned destinations of its edges.
+    - weights: A dictionary mapping each relation to one weight array per vertex, aligned with targets.
+    - degree: A dictionary mapping each relation to an array with the total edge weight of every vertex.
+    - counts: A dictionary mapping each relation to an array with the number of edges of every vertex.
+    - directed: A boolean indicating whether the graph is directed or not.
+
+    Methods:
+    - from_graphs: Builds a MultiplexGraph from one Graph per relation.
+    - add_vertex: Adds a vertex to the graph.
+    - add_edge: Sets the weight of an edge in one relation, optionally adding to the existing weight.
+    - add_edges: Sets the weights of many (source, destination, weight) edges in one relation.
+    - get_weight: Returns the weight of an edge in one relation.
+    - get_weights: Returns the weights of an edge in every relation.
+    - get_edges: Returns the edges of a vertex in one relation as a dictionary of destination to weight.
+    - get_number_of_edges: Returns the number of edges of a vertex in one relation.
+    - get_weighted_degree: Returns the total weight of the edges of a vertex in one relation.
+    - edge_weights: Iterates over the edges of a vertex with their combined weight.
+    - bfs: Performs breadth-first search over the edges of some or all relations.
+    - dijkstra: Performs Dijkstra's algorithm with a combined edge weight.
+    - freeze: Returns an immutable CSRGraph of one relation or of a combined weight.
+    """
+    def __init__(self, relations=RELATIONS, directed=False):
+        self.relations = tuple(relations)
+        self.ids = []
+        self.index = {}
+        self.targets = []
+        self.weights = {relation: [] for relation in self.relations}
+        self.degree = {relation: array('d') for relation in self.relations}
+        self.counts = {relation: array('q') for relation in self.relations}
+        self.directed = directed
+
+    @classmethod
+    def from_graphs(cls, graphs):
+        """
+        Builds a MultiplexGraph from one Graph per relation.
+
+        Args:
+            graphs (dict): A dictionary mapping each relation name to its Graph. The graphs must
+                all be directed or all undirected.
+
+        Returns:
+            MultiplexGraph: The combined graph.
+        """
+        directed = {graph.directed for graph in graphs.values()}
+        if len(directed) > 1:
+            raise ValueError("Cannot combine directed and undirected graphs")
+        multiplex = cls(graphs, directed.pop() if directed else False)
+        for graph in graphs.values():
+            for id in graph.vertices:
+                if id not in multiplex.index:
+                    multiplex.add_vertex(id)
+        # Both directions of an undirected edge are already stored, so load them as directed edges.
+        undirected = not multiplex.directed
+        multiplex.directed = True
+        for relation, graph in graphs.items():
+            for id in graph.vertices:
+                multiplex.add_edges(relation, ((id, destination, graph.get_weight(id, destination))
+                                               for destination in graph.get_edges(id)))
+        multiplex.directed = not undirected
+        return multiplex
+
+    def add_vertex(self, id):
+        if id in self.index:
+            print("Vertex already in graph")
+            return
+        id = intern_id(id)
+        self.index[id] = len(self.ids)
+        self.ids.append(id)
+        self.targets.append(array('i'))
+        for relation in self.relations:
+            self.weights[relation].append(array('d'))
+            self.degree[relation].append(0)
+            self.counts[relation].append(0)
+
+    def add_edge(self, relation, user_id1, user_id2, weight=1, accumulate=False):
+        if relation not in self.weights:
+            print(f"Unknown relation {relation}")
+            return
+        if user_id1 in self.index and user_id2 in self.index:
+            self._store_edge(relation, self.index[user_id1], user_id2, weight, accumulate)
+            if not self.directed:
+                self._store_edge(relation, self.index[user_id2], user_id1, weight, accumulate)
+
+    def add_edges(self, relation, edges, accumulate=False):
+        for user_id1, user_id2, weight in edges:
+            self.add_edge(relation, user_id1, user_id2, weight, accumulate)
+
+    def _position(self, u, user_id2):
+        v = self.index.get(user_id2)
+        if v is None:
+            return None
+        targets = self.targets[u]
+        position = bisect_left(targets, v)
+        if position < len(targets) and targets[position] == v:
+            return position
+        return None
+
+    def _store_edge(self, relation, u, user_id2, weight, accumulate):
+        v = self.index[user_id2]
+        targets = self.targets[u]
+        position = bisect_left(targets, v)
+        if position == len(targets) or targets[position] != v:
+            # A new destination gets a slot in every relation, with weight 0 where it has no edge.
+            targets.insert(position, v)
+            for column in self.weights.values():
+                column[u].insert(position, 0)
+        row = self.weights[relation][u]
+        old_weight = row[position]
+        if accumulate:
+            weight += old_weight
+        row[position] = weight
+        self.degree[relation][u] += weight - old_weight
+        self.counts[relation][u] += (weight != 0) - (old_weight != 0)
+
+    def get_weight(self, relation, user_id1, user_id2):
+        if user_id1 in self.index and relation in self.weights:
+            u = self.index[user_id1]
+            position = self._position(u, user_id2)
+            if position is not None:
+                return self.weights[relation][u][position]
+        return 0
+
+    def get_weights(self, user_id1, user_id2):
+        return {relation: self.get_weight(relation, user_id1, user_id2) for relation in self.relations}
+
+    def get_edges(self, relation, id):
+        if id not in self.index or relation not in self.weights:
+            return None
+        u = self.index[id]
+        ids = self.ids
+        return {ids[v]: weight for v, weight in zip(self.targets[u], self.weights[relation][u]) if weight != 0}
+
+    def get_number_of_edges(self, relation, id):
+        if id in self.index and relation in self.counts:
+            return self.counts[relation][self.index[id]]
+        return 0
+
+    def get_weighted_degree(self, relation, id):
+        if id in self.index and relation in self.degree:
+            return self.degree[relation][self.index[id]]
+        return 0
+
+    def edge_weights(self, u, weight=None):
+        """
+        Iterates over the edges of an interned vertex with their combined weight.
+
+        Args:
+            u (int): The interned vertex.
+            weight: How to combine the relations. None sums all of them, a relation name uses
+                that relation, a dictionary maps relations to coefficients of a weighted sum, and a
+                function is called with the weight of every relation in column order and returns the
+                combined weight, or None to skip the edge. For the first three forms, edges whose
+                selected relations all have weight 0 are skipped.
+
+        Returns:
+            iterator: (interned destination, combined weight) tuples.
+        """
+        targets = self.targets[u]
+        if isinstance(weight, str):
+            return ((v, w) for v, w in zip(targets, self.weights[weight][u]) if w != 0)
+        if callable(weight):
+            columns = [self.weights[relation][u] for relation in self.relations]
+            return ((v, w) for v, w in zip(targets, map(weight, *columns)) if w is not None)
+        coefficients = weight if weight is not None else {relation: 1 for relation in self.relations}
+        columns = [(coefficient, self.weights[relation][u]) for relation, coefficient in coefficients.items()]
+        return self._combined(targets, columns)
+
+    def _combined(self, targets, columns):
+        for position, v in enumerate(targets):
+            present = False
+            total = 0
+            for coefficient, row in columns:
+                w = row[position]
+                if w != 0:
+                    present = True
+                    total += coefficient * w
+            if present:
+                yield v, total
+
+    def bfs(self, start, relations=None):
+        """
+        Performs breadth-first search over the edges of the given relations.
+
+        Args:
+            start (any): The identifier of the starting vertex.
+            relations (list): The relations to follow. Defaults to all of them.
+
+        Returns:
+            CSRShortestPaths: Hop distances and parents, or None if start is not in the graph.
+        """
+        if start not in self.index:
+            print("Starting vertex not found")
+            return None
+        columns = [self.weights[relation] for relation in (relations or self.relations)]
+        s = self.index[start]
+        distances = array('q', [-1]) * len(self.ids)
+        parents = array('q', [-1]) * len(self.ids)
+        distances[s] = 0
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            rows = [column[u] for column in columns]
+            for position, v in enumerate(self.targets[u]):
+                if distances[v] < 0 and any(row[position] != 0 for row in rows):
+                    distances[v] = distances[u] + 1
+                    parents[v] = u
+                    queue.append(v)
+        return CSRShortestPaths(self, start, distances, parents, -1)
+
+    def dijkstra(self, start, weight=None, target=None):
+        """
+        Performs Dijkstra's algorithm with edge weights combined from the relations.
+
+        Args:
+            start (any): The identifier of the starting vertex.
+            weight: How to combine the relations (see edge_weights). Combined weights must not be negative.
+            target (any): Optional vertex at which the search stops once it is settled. Only the vertices
+                settled by then keep their distances.
+
+        Returns:
+            CSRShortestPaths: Distances and parents, or None if start is not in the graph.
+        """
+        if start not in self.index:
+            print(f"Vertex {start} not found in the graph.")
+            return None
+        inf = float('inf')
+        s = self.index[start]
+        t = self.index.get(target, -1)
+        distances = array('d', [inf]) * len(self.ids)
+        parents = array('q', [-1]) * len(self.ids)
+        distances[s] = 0
+        # A single relation is read straight from its column, skipping the zero weights inline.
+        column = self.weights[weight] if isinstance(weight, str) else None
+        heap = [(0, s)]
+        while heap:
+            distance, u = heapq.heappop(heap)
+            if distance > distances[u]:
+                continue
+            if u == t:
+                # Vertices still queued at their current distance are not settled yet; reset them.
+                for queued, v in heap:
+                    if distances[v] == queued:
+                        distances[v] = inf
+                        parents[v] = -1
+                break
+            edges = zip(self.targets[u], column[u]) if column is not None else self.edge_weights(u, weight)
+            for v, w in edges:
+                if w == 0 and column is not None:
+                    continue
+                new_distance = distance + w
+                if new_distance < distances[v]:
+                    distances[v] = new_distance
+                    parents[v] = u
+                    heapq.heappush(heap, (new_distance, v))
+        return CSRShortestPaths(self, start, distances, parents, inf)
+
+    def freeze(self, weight=None):
+        """
+        Returns an immutable CSRGraph of one relation or of a combined weight.
+
+        Args:
+            weight: How to combine the relations (see edge_weights), e.g. a relation name.
+
+        Returns:
+            CSRGraph: The frozen graph, with the same interned vertex order.
+        """
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        for u in range(len(self.ids)):
+            for v, w in self.edge_weights(u, weight):
+                targets.append(v)
+                weights.append(w)
+            offsets.append(len(targets))
+        return CSRGraph(list(self.ids), offsets, targets, weights, self.directed)
@@ -0,0 +1,97 @@
+"""
+A bundled, seedable pool of realistic user names.
+
+generate_names combines the first and last names below. Every full name comes
+from a distinct index, so the names are unique without checking them against
+each other, and a million names take well under a second. Up to
+len(FIRST_NAMES) * len(LAST_NAMES) names are plain "First Last" names. Beyond that,
+each further block of that size adds a middle initial ("First J. Last") and then
+a number ("First Last 2"). No third-party package is needed, unlike Faker.
+"""
+import math
+import random
+
+FIRST_NAMES = (
+    'Aaron', 'Abigail', 'Adam', 'Adrian', 'Aiden', 'Alan', 'Albert', 'Alex', 'Alexa', 'Alice',
+    'Allison', 'Alyssa', 'Amanda', 'Amber', 'Amelia', 'Amy', 'Andrea', 'Andrew', 'Angela', 'Anna',
+    'Anthony', 'Ariana', 'Arthur', 'Ashley', 'Aubrey', 'Audrey', 'Austin', 'Ava', 'Barbara', 'Benjamin',
+    'Beth', 'Betty', 'Beverly', 'Blake', 'Bradley', 'Brandon', 'Brenda', 'Brian', 'Brittany', 'Brooke',
+    'Bruce', 'Bryan', 'Caleb', 'Cameron', 'Carl', 'Carlos', 'Carol', 'Caroline', 'Catherine', 'Charles',
+    'Charlotte', 'Chelsea', 'Cheryl', 'Chloe', 'Christian', 'Christina', 'Christopher', 'Claire', 'Cody', 'Colin',
+    'Connor', 'Courtney', 'Craig', 'Cynthia', 'Daniel', 'Danielle', 'David', 'Deborah', 'Dennis', 'Derek',
+    'Diana', 'Diane', 'Dominic', 'Donald', 'Donna', 'Dorothy', 'Dylan', 'Edward', 'Elena', 'Elijah',
+    'Elizabeth', 'Ella', 'Emily', 'Emma', 'Eric', 'Ethan', 'Eugene', 'Evan', 'Evelyn', 'Faith',
+    'Felix', 'Frances', 'Frank', 'Gabriel', 'Gabriella', 'Gary', 'George', 'Grace', 'Gregory', 'Hailey',
+    'Hannah', 'Harold', 'Harper', 'Heather', 'Helen', 'Henry', 'Holly', 'Hunter', 'Ian', 'Isaac',
+    'Isabella', 'Jack', 'Jacob', 'Jacqueline', 'James', 'Jamie', 'Janet', 'Jason', 'Jeffrey', 'Jennifer',
+    'Jeremy', 'Jerry', 'Jessica', 'Joan', 'Joel', 'John', 'Jonathan', 'Jordan', 'Joseph', 'Joshua',
+    'Joyce', 'Julia', 'Julian', 'Justin', 'Karen', 'Katherine', 'Kathleen', 'Kayla', 'Keith', 'Kelly',
+    'Kenneth', 'Kevin', 'Kimberly', 'Kyle', 'Laura', 'Lauren', 'Lawrence', 'Leah', 'Leo', 'Liam',
+    'Lillian', 'Linda', 'Lisa', 'Logan', 'Lucas', 'Lucy', 'Luke', 'Madison', 'Margaret', 'Maria',
+    'Marie', 'Mark', 'Martha', 'Mason', 'Matthew', 'Megan', 'Melissa', 'Michael', 'Michelle', 'Mila',
+    'Nancy', 'Natalie', 'Nathan', 'Nicholas', 'Nicole', 'Noah', 'Olivia', 'Oscar', 'Owen', 'Pamela',
+    'Patricia', 'Patrick', 'Paul', 'Peter', 'Philip', 'Rachel', 'Ralph', 'Raymond', 'Rebecca', 'Richard',
+    'Riley', 'Robert', 'Ronald', 'Ruby', 'Russell', 'Ryan', 'Samantha', 'Samuel', 'Sandra', 'Sarah',
+    'Scott', 'Sean', 'Sharon', 'Sophia', 'Stephanie', 'Stephen', 'Steven', 'Susan', 'Taylor', 'Teresa',
+    'Thomas', 'Timothy', 'Tyler', 'Victoria', 'Vincent', 'Walter', 'William', 'Wyatt', 'Zachary', 'Zoe',
+)
+
+LAST_NAMES = (
+    'Adams', 'Alexander', 'Allen', 'Alvarez', 'Anderson', 'Armstrong', 'Bailey', 'Baker', 'Barnes', 'Bell',
+    'Bennett', 'Black', 'Boyd', 'Bradley', 'Brooks', 'Brown', 'Bryant', 'Burke', 'Butler', 'Campbell',
+    'Carpenter', 'Carter', 'Castillo', 'Chavez', 'Clark', 'Cole', 'Coleman', 'Collins', 'Cook', 'Cooper',
+    'Cox', 'Crawford', 'Cruz', 'Cunningham', 'Daniels', 'Davis', 'Diaz', 'Dixon', 'Duncan', 'Dunn',
+    'Edwards', 'Elliott', 'Ellis', 'Evans', 'Ferguson', 'Fisher', 'Flores', 'Ford', 'Foster', 'Fox',
+    'Freeman', 'Garcia', 'Gardner', 'Gibson', 'Gomez', 'Gonzales', 'Gordon', 'Graham', 'Grant', 'Gray',
+    'Green', 'Griffin', 'Hall', 'Hamilton', 'Harper', 'Harris', 'Harrison', 'Hart', 'Hawkins', 'Hayes',
+    'Henderson', 'Henry', 'Hernandez', 'Hill', 'Holmes', 'Howard', 'Hudson', 'Hughes', 'Hunt', 'Hunter',
+    'Jackson', 'James', 'Jenkins', 'Johnson', 'Jones', 'Jordan', 'Kelly', 'Kennedy', 'Kim', 'King',
+    'Knight', 'Lane', 'Lee', 'Lewis', 'Long', 'Lopez', 'Marshall', 'Martin', 'Martinez', 'Mason',
+    'Matthews', 'Mcdonald', 'Medina', 'Meyer', 'Miller', 'Mills', 'Mitchell', 'Moore', 'Morales', 'Morgan',
+    'Morris', 'Murphy', 'Murray', 'Myers', 'Nelson', 'Nguyen', 'Nichols', 'Olson', 'Ortiz', 'Owens',
+    'Palmer', 'Parker', 'Patel', 'Patterson', 'Payne', 'Perez', 'Perry', 'Peters', 'Phillips', 'Pierce',
+    'Porter', 'Powell', 'Price', 'Ramirez', 'Ramos', 'Reed', 'Reyes', 'Reynolds', 'Rice', 'Richardson',
+    'Rivera', 'Roberts', 'Robertson', 'Robinson', 'Rodriguez', 'Rogers', 'Rose', 'Ross', 'Russell', 'Ryan',
+    'Sanchez', 'Sanders', 'Schmidt', 'Scott', 'Shaw', 'Simmons', 'Simpson', 'Smith', 'Snyder', 'Spencer',
+    'Stephens', 'Stevens', 'Stewart', 'Stone', 'Sullivan', 'Taylor', 'Thomas', 'Thompson', 'Torres', 'Tucker',
+    'Turner', 'Wagner', 'Walker', 'Wallace', 'Ward', 'Warren', 'Washington', 'Watson', 'Weaver', 'Webb',
+    'Wells', 'West', 'White', 'Williams', 'Willis', 'Wilson', 'Wood', 'Woods', 'Wright', 'Young',
+)
+
+INITIALS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def generate_names(count, seed=0):
+    """
+    Generates unique, realistic looking user names.
+
+    Args:
+        count (int): The number of names.
+        seed (int): The random seed. The same seed always gives the same names in the same order.
+
+    Returns:
+        list: The names.
+    """
+    rng = random.Random(seed)
+    first = list(FIRST_NAMES)
+    last = list(LAST_NAMES)
+    rng.shuffle(first)
+    rng.shuffle(last)
+    size = len(first) * len(last)
+    # Within a block, name i is combination (offset + step * i) mod size, which visits every
+    # combination exactly once because step and size are coprime.
+    step = rng.randrange(1, size)
+    while math.gcd(step, size) != 1:
+        step += 1
+    offset = rng.randrange(size)
+    names = []
+    for block in range(-(-count // size)):
+        if block == 0:
+            template = '{} {}'
+        elif block <= len(INITIALS):
+            template = '{} ' + INITIALS[block - 1] + '. {}'
+        else:
+            template = '{} {} ' + str(block - len(INITIALS) + 1)
+        block_count = min(size, count - len(names))
+        combinations = (divmod((offset + step * i) % size, len(first)) for i in range(block_count))
+        names.extend([template.format(first[f], last[l]) for l, f in combinations])
+    return names
@@ -0,0 +1,188 @@
+"""
+Depth-bounded k-hop neighborhood, count and reachability queries.
+
+Questions such as "who is within 2 follows of this user" only need the vertices
+at most k hops away, so these functions expand a breadth-first search one whole
+level (frontier) at a time and stop after level k instead of searching the whole
+graph. Only the vertices of the k-hop ball and their edges are touched:
+
+    k_hop_neighborhood(followGraph, 'Alice', 2)     # {'Bob': 1, 'Carol': 2, ...}
+    k_hop_count(likeGraph.freeze(), 'Alice')        # everyone reachable via likes
+
+On a Graph every frontier is expanded with sets. On a CSRGraph small frontiers
+are expanded over the interned integers in Python. Once a frontier reaches
+VECTORIZE_MIN vertices and NumPy is installed, each level is expanded with a few
+vectorized NumPy operations over the CSR arrays. With max_workers, frontiers of
+at least PARALLEL_MIN vertices are split into chunks that are expanded on worker
+threads. NumPy releases the GIL while it gathers, filters and sorts the edges.
+"""
+import csr_graph
+
+# Frontiers smaller than this are cheaper to expand in Python than with NumPy.
+VECTORIZE_MIN = 256
+# Frontiers smaller than this are not worth splitting across worker threads.
+PARALLEL_MIN = 16384
+
+def k_hop_neighborhood(graph, start, k, max_workers=None):
+    """
+    Returns the vertices within k hops of a vertex.
+
+    Args:
+        graph (Graph or CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        k (int): The largest number of hops. None places no limit.
+        max_workers (int): The number of threads that expand large CSRGraph frontiers.
+
+    Returns:
+        dict: A dictionary mapping every vertex within k hops, other than start, to its number
+            of hops, or None if start is not in the graph.
+    """
+    levels = _levels(graph, start, k, max_workers)
+    if levels is None:
+        return None
+    neighborhood = {}
+    for hops, level in enumerate(levels, 1):
+        neighborhood.update(dict.fromkeys(_ids(graph, level), hops))
+    return neighborhood
+
+def k_hop_count(graph, start, k=None, max_workers=None):
+    """
+    Counts the vertices within k hops of a vertex without building their ids.
+
+    Args:
+        graph (Graph or CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        k (int): The largest number of hops. None counts every reachable vertex.
+        max_workers (int): The number of threads that expand large CSRGraph frontiers.
+
+    Returns:
+        int: The number of vertices within k hops, other than start, or None if start is not in the graph.
+    """
+    levels = _levels(graph, start, k, max_workers)
+    if levels is None:
+        return None
+    return sum(len(level) for level in levels)
+
+def is_reachable(graph, start, destination, k=None, max_workers=None):
+    """
+    Checks whether a vertex can be reached from another, stopping at the level that reaches it.
+
+    Args:
+        graph (Graph or CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        destination (any): The identifier of the vertex to reach.
+        k (int): The largest number of hops. None places no limit.
+        max_workers (int): The number of threads that expand large CSRGraph frontiers.
+
+    Returns:
+        bool: True if destination is within k hops of start.
+    """
+    csr = hasattr(graph, 'offsets')
+    vertices = graph.index if csr else graph.vertices
+    if start not in vertices or destination not in vertices:
+        return False
+    if start == destination:
+        return True
+    target = graph.index[destination] if csr else destination
+    return any(target in level for level in _levels(graph, start, k, max_workers))
+
+def _levels(graph, start, k, max_workers):
+    # A CSRGraph (including one loaded from a snapshot) is searched over its arrays.
+    if hasattr(graph, 'offsets'):
+        if start not in graph.index:
+            print("Starting vertex not found")
+            return None
+        return _csr_levels(graph, graph.index[start], k, max_workers)
+    if start not in graph.vertices:
+        print("Starting vertex not found")
+        return None
+    return _graph_levels(graph, start, k)
+
+def _ids(graph, level):
+    if not hasattr(graph, 'offsets'):
+        return level
+    ids = graph.ids
+    return [ids[v] for v in (level.tolist() if hasattr(level, 'tolist') else level)]
+
+def _graph_levels(graph, start, k):
+    vertices = graph.vertices
+    seen = {start}
+    frontier = [start]
+    hops = 0
+    while frontier and (k is None or hops < k):
+        next_frontier = []
+        for uid in frontier:
+            for vid in vertices[uid].edges:
+                if vid not in seen:
+                    seen.add(vid)
+                    next_frontier.append(vid)
+        frontier = next_frontier
+        hops += 1
+        if frontier:
+            yield frontier
+
+def _csr_levels(graph, s, k, max_workers):
+    offsets = graph.offsets
+    targets = graph.targets
+    seen = {s}
+    frontier = [s]
+    hops = 0
+    while frontier and (k is None or hops < k):
+        if len(frontier) >= VECTORIZE_MIN:
+            np = csr_graph.load_numpy()
+            if np is not None:
+                yield from _vectorized_levels(np, graph, frontier, seen, hops, k, max_workers)
+                return
+        next_frontier = []
+        for u in frontier:
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if v not in seen:
+                    seen.add(v)
+                    next_frontier.append(v)
+        frontier = next_frontier
+        hops += 1
+        if frontier:
+            yield frontier
+
+def _vectorized_levels(np, graph, frontier, seen, hops, k, max_workers):
+    # asarray wraps the array.array, memoryview or ndarray without copying it.
+    offsets = np.asarray(graph.offsets)
+    targets = np.asarray(graph.targets)
+    frontier = np.array(frontier, dtype=np.int64)
+    # A large np.zeros array gets its pages from the operating system lazily, so only the pages
+    # holding vertices of the ball are ever touched.
+    seen_mask = np.zeros(len(graph.ids), dtype=bool)
+    seen_mask[np.fromiter(seen, dtype=np.int64, count=len(seen))] = True
+    executor = None
+    if max_workers and max_workers > 1:
+        # Imported here so that importing this module (and graph) stays cheap.
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers)
+    try:
+        while len(frontier) and (k is None or hops < k):
+            if executor is not None and len(frontier) >= PARALLEL_MIN:
+                parts = list(executor.map(lambda chunk: _unseen_neighbors(np, offsets, targets, chunk, seen_mask),
+                                          np.array_split(frontier, max_workers)))
+                neighbors = np.concatenate(parts)
+            else:
+                neighbors = _unseen_neighbors(np, offsets, targets, frontier, seen_mask)
+            frontier = np.unique(neighbors).astype(np.int64)
+            hops += 1
+            if len(frontier):
+                seen_mask[frontier] = True
+                yield frontier
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def _unseen_neighbors(np, offsets, targets, frontier, seen_mask):
+    starts = offsets[frontier]
+    lengths = offsets[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=targets.dtype)
+    # The edge positions of every frontier row, concatenated: row r covers starts[r] to starts[r] + lengths[r] - 1.
+    positions = np.arange(total, dtype=np.int64) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    neighbors = targets[positions]
+    # The result may repeat vertices; the caller removes the duplicates.
+    return neighbors[~seen_mask[neighbors]]
@@ -0,0 +1,179 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+class PathCache:
+    """
+    A bounded LRU cache of single-source BFS and Dijkstra results.
+
+    Results are cached per graph, search kind and source. Every entry remembers the
+    graph's version counter when it was computed, and a lookup after the graph was
+    changed (add_vertex, add_edge, set_weight, ...) recomputes the result, so a cached
+    answer is never stale. Graphs without a version counter, such as a CSRGraph, never
+    change. Cached results are shared between callers and must not be modified.
+
+    bfs and dijkstra always cache their result. frequent only searches and caches once
+    a source has been asked for repeatedly, for callers that have a cheaper way to
+    answer a one-off query.
+
+    Attributes:
+        maxsize (int): The maximum number of cached results.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups not answered from the cache.
+        evictions (int): The number of results dropped because the cache was full.
+        invalidations (int): The number of results dropped because their graph changed.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        # How often recent uncached (graph, version, kind, source) keys were asked for by frequent.
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bfs(self, graph, source):
+        """
+        Returns the breadth-first search result from a source, computing it if needed.
+
+        Args:
+            graph (Graph or CSRGraph): The graph to search.
+            source (any): The identifier of the starting vertex.
+
+        Returns:
+            ShortestPaths: The result, or None if the source is not in the graph.
+        """
+        return self._get(graph, 'bfs', source)
+
+    def dijkstra(self, graph, source):
+        """
+        Returns the Dijkstra result from a source, computing it if needed.
+
+        Args:
+            graph (Graph or CSRGraph): The graph to search.
+            source (any): The identifier of the starting vertex.
+
+        Returns:
+            ShortestPaths: The result, or None if the source is not in the graph.
+        """
+        return self._get(graph, 'dijkstra', source)
+
+    def lookup(self, graph, kind, source):
+        """
+        Returns a cached result without running a search.
+
+        Args:
+            graph (Graph or CSRGraph): The searched graph.
+            kind (str): 'bfs' or 'dijkstra'.
+            source (any): The identifier of the starting vertex.
+
+        Returns:
+            ShortestPaths: The cached result, or None if there is no current one.
+        """
+        with self._lock:
+            return self._count(self._lookup(graph, kind, source))
+
+    def frequent(self, graph, kind, source, min_queries=2):
+        """
+        Returns a cached result, running and caching the search once a source is asked for repeatedly.
+
+        Args:
+            graph (Graph or CSRGraph): The graph to search.
+            kind (str): 'bfs' or 'dijkstra'.
+            source (any): The identifier of the starting vertex.
+            min_queries (int): The number of recent calls for the same source, graph version and kind
+                after which the search is run and cached.
+
+        Returns:
+            ShortestPaths: The result, or None if it is not cached and the source was not asked for
+            often enough yet (or is not in the graph).
+        """
+        with self._lock:
+            result = self._count(self._lookup(graph, kind, source))
+            if result is not None:
+                return result
+            key = (id(graph), getattr(graph, 'version', 0), kind, source)
+            queries = self._queries.pop(key, 0) + 1
+            if queries < min_queries:
+                self._queries[key] = queries
+                while len(self._queries) > self.maxsize:
+                    self._queries.popitem(last=False)
+                return None
+        return self.search(graph, kind, source)
+
+    def search(self, graph, kind, source):
+        """
+        Runs a search and caches its result without looking it up first.
+
+        Args:
+            graph (Graph or CSRGraph): The graph to search.
+            kind (str): 'bfs' or 'dijkstra'.
+            source (any): The identifier of the starting vertex.
+
+        Returns:
+            ShortestPaths: The result, or None if the source is not in the graph.
+        """
+        version = getattr(graph, 'version', 0)
+        result = graph.bfs(source) if kind == 'bfs' else graph.dijkstra(source)
+        if result is None:
+            return None
+        with self._lock:
+            key = (id(graph), kind, source)
+            self._entries[key] = (weakref.ref(graph), version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def _count(self, result):
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _lookup(self, graph, kind, source):
+        key = (id(graph), kind, source)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        graph_ref, version, result = entry
+        if graph_ref() is not graph or version != getattr(graph, 'version', 0):
+            del self._entries[key]
+            self.invalidations += 1
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _get(self, graph, kind, source):
+        with self._lock:
+            result = self._count(self._lookup(graph, kind, source))
+        if result is not None:
+            return result
+        return self.search(graph, kind, source)
+
+    def clear(self):
+        """
+        Drops every cached result. The counters are kept.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries.clear()
+            self._queries.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The hits, misses, evictions, invalidations and current size.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'invalidations': self.invalidations, 'size': len(self._entries)}
@@ -0,0 +1,374 @@
+"""
+Non-interactive queries against the social network, one JSON object per line.
+
+The graphs are loaded once, from a snapshot directory, event files or a
+synthetic network, and every query read from a file or stdin is answered with
+one JSON line on stdout:
+
+    python query_cli.py --snapshot snapshots/ queries.jsonl > answers.jsonl
+
+    {"id": 1, "type": "path", "graph": "follows", "source": "Alice", "destination": "Bob"}
+    {"id": 2, "type": "path", "graph": "likes", "source": "Alice", "destination": "Bob", "weighted": true}
+    {"id": 3, "type": "engagement", "user": "Alice"}
+    {"id": 4, "type": "engagement_path", "source": "Alice", "destination": "Bob", "max_hops": 4}
+    {"id": 5, "type": "influence", "user": "Alice"}
+    {"id": 6, "type": "stats", "user": "Alice"}
+    {"id": 7, "type": "leaderboard", "board": "influence", "k": 100}
+    {"id": 8, "type": "neighborhood", "graph": "follows", "user": "Alice", "hops": 2}
+    {"id": 9, "type": "neighborhood", "graph": "likes", "user": "Alice", "count_only": true}
+
+The id, when given, is copied to the answer. A query that cannot be answered
+produces {"id": ..., "error": "..."} and the remaining queries still run.
+"""
+import argparse
+import json
+import sys
+import threading
+import social_network
+
+GRAPHS = {
+    'likes': lambda: social_network.likeGraph,
+    'follows': lambda: social_network.followGraph,
+    'comments': lambda: social_network.commentGraph,
+    'influence': lambda: social_network.influenceGraph,
+}
+
+_influence_ready = False
+_influence_lock = threading.Lock()
+
+class QueryError(ValueError):
+    """
+    Raised for a query that is malformed or names unknown users or graphs.
+    """
+
+def _field(query, name, default=None, required=True):
+    if name in query:
+        return query[name]
+    if required:
+        raise QueryError(f"Missing field '{name}'")
+    return default
+
+def _integer(query, name, default=None, minimum=0):
+    value = _field(query, name, default, required=False)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < minimum):
+        raise QueryError(f"'{name}' must be {'a non-negative' if minimum == 0 else 'a positive'} integer")
+    return value
+
+def _seconds(query, name, default):
+    value = _field(query, name, default, required=False)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise QueryError(f"'{name}' must be a positive number of seconds")
+    return value
+
+def _user(query, name, graph=None):
+    user = _field(query, name)
+    graph = graph if graph is not None else social_network.likeGraph
+    if user not in graph.vertices:
+        raise QueryError(f"Unknown user {user!r}")
+    return user
+
+def ensure_influence():
+    """
+    Builds the influence graph from the loaded graphs unless it is already built.
+
+    Returns:
+        None
+    """
+    global _influence_ready
+    if not _influence_ready:
+        with _influence_lock:
+            if not _influence_ready:
+                social_network.generate_influence_graph_batch()
+                _influence_ready = True
+
+def parse_path_query(query):
+    """
+    Validates a path query.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        tuple: The graph, the source, the destination and whether the path is weighted.
+
+    Raises:
+        QueryError: If the graph or a user is unknown.
+    """
+    name = _field(query, 'graph', 'follows', required=False)
+    if name not in GRAPHS:
+        raise QueryError(f"Unknown graph {name!r}")
+    if name == 'influence':
+        ensure_influence()
+    graph = GRAPHS[name]()
+    start = _user(query, 'source', graph)
+    destination = _user(query, 'destination', graph)
+    return graph, start, destination, bool(_field(query, 'weighted', False, required=False))
+
+def path_answer(path, weighted):
+    """
+    Formats a path for an answer.
+
+    Args:
+        path (Path): The path, or None if there is none.
+        weighted (bool): Whether the cost is a weight ('cost') or a number of edges ('hops').
+
+    Returns:
+        dict: The answer.
+    """
+    cost_name = 'cost' if weighted else 'hops'
+    if path is None:
+        return {'path': None, cost_name: None}
+    return {'path': list(path), cost_name: path.cost}
+
+def answer_path(query):
+    """
+    Answers a path query: the fewest-hop path, or the lowest-weight path when weighted is true.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    graph, start, destination, weighted = parse_path_query(query)
+    if weighted:
+        # A cached tree answers at once; otherwise the search stops when the destination is settled.
+        paths = social_network.path_cache.lookup(graph, 'dijkstra', start)
+        if paths is None:
+            paths = graph.dijkstra(start, target=destination)
+        return path_answer(paths.path_to(destination), True)
+    return path_answer(social_network.find_shortest_path(graph, start, destination), False)
+
+def answer_engagement(query):
+    """
+    Answers an engagement query: the engagement rate of a user.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    return {'engagement_rate': social_network.calculate_engagement_rate(_user(query, 'user'))}
+
+def answer_engagement_path(query):
+    """
+    Answers an engagement_path query: the highest engagement path between two users.
+
+    When the time budget runs out before any path is found, the answer has 'timed_out': true
+    instead of claiming that there is no path.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    max_hops = _integer(query, 'max_hops', 6)
+    beam_width = _integer(query, 'beam_width', 64, minimum=1)
+    time_budget = _seconds(query, 'time_budget', 1.0)
+    ensure_influence()
+    start = _user(query, 'source')
+    destination = _user(query, 'destination')
+    try:
+        path, engagement = social_network.calculate_highest_engagement_path(
+            start, destination, max_hops=max_hops, beam_width=beam_width, time_budget=time_budget)
+    except TimeoutError:
+        return {'path': None, 'engagement': None, 'timed_out': True}
+    return {'path': path, 'engagement': engagement if path is not None else None}
+
+def answer_influence(query):
+    """
+    Answers an influence query: the influence of a user on everyone, or on one destination.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    ensure_influence()
+    user = _user(query, 'user')
+    graph = social_network.influenceGraph
+    if 'destination' in query:
+        return {'influence': graph.get_weight(user, _user(query, 'destination'))}
+    return {'influence': {name: graph.get_weight(user, name) for name in graph.get_edges(user)}}
+
+def answer_stats(query):
+    """
+    Answers a stats query: the likes, follows and comments of a user.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    user = _user(query, 'user')
+    return {'likes': social_network.get_likes(user),
+            'follows': social_network.followGraph.get_number_of_edges(user),
+            'comments': social_network.get_comments(user)}
+
+def answer_leaderboard(query):
+    """
+    Answers a leaderboard query: the top k users by influence or by engagement rate.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    board = _field(query, 'board', 'influence', required=False)
+    k = _integer(query, 'k', 100)
+    if board == 'influence':
+        ensure_influence()
+        top = social_network.top_influencers(k)
+    elif board == 'engagement':
+        top = social_network.top_engaged_users(k)
+    else:
+        raise QueryError(f"Unknown leaderboard {board!r}")
+    return {'top': [[name, score] for name, score in top]}
+
+def answer_neighborhood(query):
+    """
+    Answers a neighborhood query: the users within a number of hops of a user, or only how many
+    there are when count_only is true. Without hops, every reachable user is included.
+
+    Args:
+        query (dict): The query.
+
+    Returns:
+        dict: The answer.
+    """
+    name = _field(query, 'graph', 'follows', required=False)
+    if name not in GRAPHS:
+        raise QueryError(f"Unknown graph {name!r}")
+    if name == 'influence':
+        ensure_influence()
+    graph = GRAPHS[name]()
+    user = _user(query, 'user', graph)
+    hops = _integer(query, 'hops')
+    if _field(query, 'count_only', False, required=False):
+        return {'count': graph.k_hop_count(user, hops)}
+    users = graph.k_hop_neighborhood(user, hops)
+    return {'count': len(users), 'users': users}
+
+QUERIES = {
+    'path': answer_path,
+    'engagement': answer_engagement,
+    'engagement_path': answer_engagement_path,
+    'influence': answer_influence,
+    'stats': answer_stats,
+    'leaderboard': answer_leaderboard,
+    'neighborhood': answer_neighborhood,
+}
+
+def answer_query(query):
+    """
+    Answers one query against the loaded graphs.
+
+    Args:
+        query (dict): The query. Its type selects the answer (see QUERIES and the module docstring).
+
+    Returns:
+        dict: The answer, with the id of the query when it has one.
+
+    Raises:
+        QueryError: If the query is malformed or names an unknown type, graph or user.
+    """
+    if not isinstance(query, dict):
+        raise QueryError("A query must be a JSON object")
+    kind = _field(query, 'type')
+    if kind not in QUERIES:
+        raise QueryError(f"Unknown query type {kind!r}")
+    answer = QUERIES[kind](query)
+    if 'id' in query:
+        answer = {'id': query['id'], **answer}
+    return answer
+
+def answer_lines(lines, output):
+    """
+    Answers a stream of JSON lines, writing one JSON line per query. Blank lines are skipped.
+
+    Args:
+        lines (iterable): The query lines.
+        output (file): The file the answers are written to.
+
+    Returns:
+        tuple: The number of answered queries and the number of errors.
+    """
+    answered, errors = 0, 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        query = None
+        try:
+            query = json.loads(line)
+            answer = answer_query(query)
+            answered += 1
+        except (QueryError, json.JSONDecodeError, TypeError) as e:
+            errors += 1
+            answer = {'error': str(e)}
+            if isinstance(query, dict) and 'id' in query:
+                answer = {'id': query['id'], **answer}
+        output.write(json.dumps(answer))
+        output.write('\n')
+    return answered, errors
+
+def load_network(snapshot=None, events=None, synthetic=None, seed=0, compact=False):
+    """
+    Loads the graphs that queries are answered from.
+
+    Args:
+        snapshot (str): A snapshot directory written by social_network.save_snapshot.
+        events (list): Event files for social_network.load_interaction_events.
+        synthetic (int): The number of users of a synthetic network.
+        seed (int): The seed of the synthetic network.
+        compact (bool): Use the compact graph representation.
+
+    Returns:
+        None
+    """
+    global _influence_ready
+    if snapshot:
+        social_network.load_snapshot(snapshot, compact)
+        # A snapshot includes the influence graph; rebuild it only if it was saved empty.
+        graph = social_network.influenceGraph
+        _influence_ready = any(graph.get_number_of_edges(name) for name in graph.vertices)
+    elif events:
+        social_network.load_interaction_events(events)
+        _influence_ready = False
+    elif synthetic:
+        social_network.generate_synthetic_network(synthetic, seed=seed, compact=compact)
+        _influence_ready = False
+    else:
+        social_network.generate_random_names()
+        _influence_ready = False
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer JSON-lines queries against the social network.")
+    parser.add_argument('queries', nargs='?', default='-', help="The query file, or - for stdin")
+    parser.add_argument('--output', default='-', help="The answer file, or - for stdout")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--snapshot', help="Load the graphs from this snapshot directory")
+    source.add_argument('--events', nargs='+', help="Load the graphs from these event files")
+    source.add_argument('--synthetic', type=int, help="Generate a synthetic network with this many users")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', help="Use the compact graph representation")
+    args = parser.parse_args()
+    load_network(args.snapshot, args.events, args.synthetic, args.seed, args.compact)
+    queries = sys.stdin if args.queries == '-' else open(args.queries, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        answered, errors = answer_lines(queries, output)
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Answered {answered} queries, {errors} errors", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+An asyncio HTTP/JSON server answering queries against the loaded social network.
+
+The graphs are loaded once (see query_cli.load_network) and queries in the
+query_cli format are posted to /query, either one object or a list of them:
+
+    python query_server.py --snapshot snapshots/ --port 8080
+
+    curl -d '{"type": "path", "graph": "likes", "source": "Alice", "destination": "Bob"}' \\
+        http://127.0.0.1:8080/query
+
+GET /health answers {"status": "ok"} and GET /stats returns the server and
+path cache counters.
+
+Every answer is computed on a thread pool so the event loop keeps accepting
+connections. Path queries are answered from the shortest path tree of their
+source: concurrent queries with the same graph, source and kind wait for one
+traversal instead of starting their own, and finished trees stay in
+social_network.path_cache. At most max_pending requests are in progress at a
+time; further requests are rejected at once with 503 and a Retry-After header
+instead of queueing without bound.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import query_cli
+import social_network
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+class QueryServer:
+    """
+    A local HTTP/JSON query server.
+
+    Attributes:
+        host (str): The address to listen on.
+        port (int): The port to listen on. 0 picks a free port, which is stored here once started.
+        max_pending (int): The number of requests answered at the same time before new ones get 503.
+        max_batch (int): The largest number of queries in one request.
+        max_body (int): The largest request body in bytes.
+        served (int): The number of queries answered.
+        coalesced (int): The number of path queries that reused another query's traversal.
+        rejected (int): The number of requests rejected with 503.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8080, max_workers=4, max_pending=64, max_batch=1000,
+                 max_body=1 << 20):
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_body = max_body
+        self.served = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._inflight = {}
+        self._pending = 0
+        self._server = None
+
+    async def start(self):
+        """
+        Starts listening.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """
+        Starts listening if needed and serves until cancelled.
+
+        Returns:
+            None
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening and shuts the thread pool down.
+
+        Returns:
+            None
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """
+        Returns the server and path cache counters.
+
+        Returns:
+            dict: The counters.
+        """
+        return {'served': self.served, 'coalesced': self.coalesced, 'rejected': self.rejected,
+                'pending': self._pending, 'inflight_traversals': len(self._inflight),
+                'path_cache': social_network.path_cache.stats()}
+
+    async def answer(self, query):
+        """
+        Answers one query.
+
+        Args:
+            query (dict): The query, in the query_cli format.
+
+        Returns:
+            dict: The answer, or {'error': ...} if the query cannot be answered.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            if isinstance(query, dict) and query.get('type') == 'path':
+                # Parsing a query on the influence graph may build it first, which must not block the loop.
+                graph, start, destination, weighted = await loop.run_in_executor(
+                    self._executor, query_cli.parse_path_query, query)
+                paths = await self._tree(graph, 'dijkstra' if weighted else 'bfs', start)
+                answer = query_cli.path_answer(paths.path_to(destination), weighted)
+                if 'id' in query:
+                    answer = {'id': query['id'], **answer}
+            else:
+                answer = await loop.run_in_executor(self._executor, query_cli.answer_query, query)
+        except (query_cli.QueryError, TypeError) as e:
+            answer = {'error': str(e)}
+            if isinstance(query, dict) and 'id' in query:
+                answer = {'id': query['id'], **answer}
+        self.served += 1
+        return answer
+
+    async def _tree(self, graph, kind, source):
+        paths = social_network.path_cache.lookup(graph, kind, source)
+        if paths is not None:
+            return paths
+        key = (id(graph), getattr(graph, 'version', 0), kind, source)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        # The lookup above already counted the miss, so search without looking up again.
+        future = asyncio.get_running_loop().run_in_executor(self._executor, social_network.path_cache.search,
+                                                             graph, kind, source)
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, answer = await self._route(method, path, body)
+                except Exception as e:
+                    status, answer = 500, {'error': f"{type(e).__name__}: {e}"}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, answer, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        if length > self.max_body:
+            # The body is not read, so the connection cannot be reused.
+            headers['connection'] = 'close'
+            return method, path, headers, None
+        body = await reader.readexactly(length) if length else b''
+        return method, path, headers, body
+
+    async def _route(self, method, path, body):
+        if path == '/health' and method == 'GET':
+            return 200, {'status': 'ok'}
+        if path == '/stats' and method == 'GET':
+            return 200, self.stats()
+        if path != '/query':
+            return 404, {'error': f"Unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': "Queries must be POSTed"}
+        if body is None:
+            return 413, {'error': f"Request bodies are limited to {self.max_body} bytes"}
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            return 503, {'error': "Too many pending requests, retry later"}
+        try:
+            queries = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return 400, {'error': str(e)}
+        if isinstance(queries, list) and len(queries) > self.max_batch:
+            return 413, {'error': f"Requests are limited to {self.max_batch} queries"}
+        self._pending += 1
+        try:
+            if isinstance(queries, list):
+                return 200, await asyncio.gather(*(self.answer(query) for query in queries))
+            answer = await self.answer(queries)
+            return (400 if 'error' in answer else 200), answer
+        finally:
+            self._pending -= 1
+
+    def _write_response(self, writer, status, answer, keep_alive):
+        body = json.dumps(answer).encode('utf-8')
+        headers = [f"HTTP/1.1 {status} {REASONS[status]}", "Content-Type: application/json",
+                   f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve JSON queries against the social network over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help="Threads answering queries")
+    parser.add_argument('--max-pending', type=int, default=64, help="Requests in progress before answering 503")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--snapshot', help="Load the graphs from this snapshot directory")
+    source.add_argument('--events', nargs='+', help="Load the graphs from these event files")
+    source.add_argument('--synthetic', type=int, help="Generate a synthetic network with this many users")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', help="Use the compact graph representation")
+    args = parser.parse_args()
+    query_cli.load_network(args.snapshot, args.events, args.synthetic, args.seed, args.compact)
+    # Build the influence graph before serving so that no request has to wait for it.
+    query_cli.ensure_influence()
+    server = QueryServer(args.host, args.port, args.workers, args.max_pending)
+
+    async def run():
+        port = await server.start()
+        print(f"Serving on http://{server.host}:{port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
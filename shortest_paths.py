@@ -0,0 +1,260 @@
+class Path:
+    """
+    A path through a graph together with its total cost.
+
+    Iterating over a Path yields the vertex ids from the start to the destination.
+
+    Attributes:
+        vertices (list): The identifiers along the path.
+        cost (number): The total weight of the path (the number of hops for unweighted searches).
+    """
+
+    def __init__(self, vertices, cost):
+        self.vertices = vertices
+        self.cost = cost
+
+    def __iter__(self):
+        return iter(self.vertices)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __getitem__(self, i):
+        return self.vertices[i]
+
+    def __eq__(self, other):
+        if isinstance(other, Path):
+            return self.vertices == other.vertices and self.cost == other.cost
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Path({self.vertices!r}, {self.cost!r})"
+
+class ShortestPaths:
+    """
+    The result of a single-source shortest path search.
+
+    Instances are returned by Graph.bfs and Graph.dijkstra instead of writing the
+    distance and parent of every vertex into the shared Vertex objects. A result can be passed
+    back into another search to reuse its dictionaries. A search that stops early at a
+    target only holds the vertices it reached whose distances are final: every vertex
+    settled before the target, the target itself and, for breadth-first search, the
+    vertices already queued.
+
+    Attributes:
+        source (any): The vertex the search started from.
+        distances (dict): The distance from the source to every reached vertex.
+        parents (dict): The predecessor of every reached vertex (None for the source).
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.distances = {}
+        self.parents = {}
+
+    def reset(self, source):
+        """
+        Clears the result so it can be filled by a new search.
+
+        Args:
+            source (any): The vertex the new search starts from.
+
+        Returns:
+            None
+        """
+        self.source = source
+        self.distances.clear()
+        self.parents.clear()
+
+    def distance_to(self, id):
+        """
+        Returns the distance from the source to a vertex.
+
+        Args:
+            id (any): The identifier of the vertex.
+
+        Returns:
+            float: The distance, or infinity if the vertex was not reached.
+        """
+        return self.distances.get(id, float('inf'))
+
+    def parent_of(self, id):
+        """
+        Returns the predecessor of a vertex on its shortest path.
+
+        Args:
+            id (any): The identifier of the vertex.
+
+        Returns:
+            any: The identifier of the parent, or None for the source and unreached vertices.
+        """
+        return self.parents.get(id)
+
+    def has_path_to(self, id):
+        """
+        Checks whether a vertex was reached by the search.
+
+        Args:
+            id (any): The identifier of the vertex.
+
+        Returns:
+            bool: True if there is a path from the source to the vertex.
+        """
+        return id in self.distances
+
+    def path_to(self, id):
+        """
+        Reconstructs the shortest path from the source to a vertex.
+
+        Args:
+            id (any): The identifier of the destination vertex.
+
+        Returns:
+            Path: The path and its cost, or None if the vertex was not reached.
+        """
+        if id not in self.distances:
+            return None
+        cost = self.distances[id]
+        # Appending and reversing once is faster than counting the hops first
+        # to fill a preallocated list, because every step is a dictionary lookup.
+        parent_of = self.parents.get
+        path = []
+        while id is not None:
+            path.append(id)
+            id = parent_of(id)
+        path.reverse()
+        return Path(path, cost)
+
+    def paths_to(self, destinations):
+        """
+        Reconstructs the shortest paths from the source to many vertices in one pass over the tree.
+
+        The destinations are handled nearest first, and each path stops walking up the tree at the
+        first destination whose path is already known and reuses it as its prefix.
+
+        Args:
+            destinations (iterable): The identifiers of the destination vertices.
+
+        Returns:
+            dict: A dictionary mapping each destination to its Path, or None if it was not reached.
+        """
+        destinations = list(destinations)
+        distances = self.distances
+        parent_of = self.parents.get
+        result = {}
+        known = {}
+        for destination in sorted((d for d in destinations if d in distances), key=distances.get):
+            walk = []
+            id = destination
+            while id is not None and id not in known:
+                walk.append(id)
+                id = parent_of(id)
+            walk.reverse()
+            vertices = known[id] + walk if id is not None else walk
+            known[destination] = vertices
+            result[destination] = Path(vertices, distances[destination])
+        for destination in destinations:
+            result.setdefault(destination, None)
+        return result
+
+class CSRShortestPaths(ShortestPaths):
+    """
+    A shortest path result backed by dense arrays indexed by interned vertex id.
+
+    Attributes:
+        graph (CSRGraph): The graph that was searched; only its ids and index are used.
+        source (any): The vertex the search started from.
+        dist (array): The distance of every vertex, or the unreached marker.
+        parent (array): The interned parent of every vertex, or -1.
+        unreached (number): The value dist holds for vertices that were not reached.
+    """
+
+    def __init__(self, graph, source, dist, parent, unreached):
+        self.graph = graph
+        self.source = source
+        self.dist = dist
+        self.parent = parent
+        self.unreached = unreached
+
+    @property
+    def distances(self):
+        ids = self.graph.ids
+        return {ids[i]: d for i, d in enumerate(self.dist) if d != self.unreached}
+
+    @property
+    def parents(self):
+        ids = self.graph.ids
+        return {ids[i]: (ids[p] if p >= 0 else None)
+                for i, p in enumerate(self.parent) if self.dist[i] != self.unreached}
+
+    def reset(self, source):
+        raise TypeError("CSRShortestPaths cannot be reused")
+
+    def distance_to(self, id):
+        i = self.graph.index.get(id)
+        if i is None or self.dist[i] == self.unreached:
+            return float('inf')
+        return self.dist[i]
+
+    def parent_of(self, id):
+        i = self.graph.index.get(id)
+        if i is None or self.parent[i] < 0:
+            return None
+        return self.graph.ids[self.parent[i]]
+
+    def has_path_to(self, id):
+        i = self.graph.index.get(id)
+        return i is not None and self.dist[i] != self.unreached
+
+    def path_to(self, id):
+        i = self.graph.index.get(id)
+        if i is None or self.dist[i] == self.unreached:
+            return None
+        return Path(self._walk(i), self.dist[i])
+
+    def paths_to(self, destinations):
+        destinations = list(destinations)
+        index = self.graph.index
+        ids = self.graph.ids
+        dist = self.dist
+        parent = self.parent
+        unreached = self.unreached
+        reached = [(dist[index[d]], index[d], d) for d in destinations
+                   if d in index and dist[index[d]] != unreached]
+        reached.sort(key=lambda entry: entry[0])
+        result = {}
+        known = {}
+        for distance, i, destination in reached:
+            walk = []
+            v = i
+            while v >= 0 and v not in known:
+                walk.append(ids[v])
+                v = parent[v]
+            walk.reverse()
+            vertices = known[v] + walk if v >= 0 else walk
+            known[i] = vertices
+            result[destination] = Path(vertices, distance)
+        for destination in destinations:
+            result.setdefault(destination, None)
+        return result
+
+    def _walk(self, i):
+        # The parent array makes each step cheap, so the hops are counted first (or
+        # read from the distance of a BFS) and the ids are written into a list of
+        # the final length from the back.
+        parent = self.parent
+        if self.unreached == -1:
+            length = self.dist[i] + 1
+        else:
+            length = 0
+            v = i
+            while v >= 0:
+                length += 1
+                v = parent[v]
+        ids = self.graph.ids
+        path = [None] * length
+        while i >= 0:
+            length -= 1
+            path[length] = ids[i]
+            i = parent[i]
+        return path
@@ -0,0 +1,184 @@
+"""
+Versioned binary snapshots of graphs that are loaded with mmap.
+
+A snapshot file stores one CSRGraph:
+
+    header      magic b'SXGRAPH\\0', then version, flags (uint32 each) and
+                vertex count, edge count, name table size (uint64 each)
+    names       n + 1 int64 offsets into the UTF-8 name table, then the table
+    offsets     n + 1 int64 row offsets
+    targets     m int32 destinations (int64 when the wide flag is set)
+    weights     m float64 weights
+
+Every section starts on an 8 byte boundary and numbers are stored in the byte
+order of the machine that wrote the file. Loading maps the file and wraps the
+sections in memoryview (or NumPy) views without copying them, so the arrays are
+shared through the page cache by every process that loads the same file. Vertex
+ids are stored as strings. They are decoded from the mapped name table when read
+(see NameTable), and the id to integer index is built on the first lookup by id.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from csr_graph import CSRGraph
+
+MAGIC = b'SXGRAPH\0'
+VERSION = 1
+HEADER = struct.Struct('=8sIIQQQ')
+FLAG_DIRECTED = 1
+FLAG_WIDE_TARGETS = 2
+FLAG_BIG_ENDIAN = 4
+EXTENSION = '.sxg'
+
+def _padding(size):
+    return -size % 8
+
+class NameTable(Sequence):
+    """
+    The vertex ids of a mapped snapshot, decoded from the name table only when they are read.
+
+    A NameTable pickles as a plain list, so it can be sent to worker processes.
+    """
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("name index out of range")
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        offsets = self._offsets
+        data = self._data
+        for i in range(len(offsets) - 1):
+            yield str(data[offsets[i]:offsets[i + 1]], 'utf-8')
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+def save_graph(graph, path):
+    """
+    Writes a graph to a snapshot file.
+
+    Args:
+        graph (Graph or CSRGraph): The graph to save. A Graph is frozen first.
+        path (str): The file to write.
+
+    Returns:
+        None
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    names = [str(id).encode('utf-8') for id in graph.ids]
+    name_offsets = array('q', [0])
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+    name_data = b''.join(names)
+    wide = len(graph.ids) >= 2 ** 31
+    targets = array('q' if wide else 'i', graph.targets)
+    offsets = array('q', graph.offsets)
+    weights = array('d', graph.weights)
+    flags = ((FLAG_DIRECTED if graph.directed else 0) | (FLAG_WIDE_TARGETS if wide else 0)
+             | (FLAG_BIG_ENDIAN if sys.byteorder == 'big' else 0))
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, len(graph.ids), len(targets), len(name_data)))
+        file.write(b'\0' * _padding(HEADER.size))
+        file.write(name_offsets)
+        file.write(name_data)
+        file.write(b'\0' * _padding(len(name_data)))
+        file.write(offsets)
+        file.write(targets)
+        file.write(b'\0' * _padding(targets.itemsize * len(targets)))
+        file.write(weights)
+
+def load_graph(path, use_numpy=False):
+    """
+    Maps a snapshot file into memory as a read-only CSRGraph.
+
+    Args:
+        path (str): The file to load.
+        use_numpy (bool): Expose the arrays as NumPy views instead of memoryviews.
+
+    Returns:
+        CSRGraph: The graph. Its offsets, targets and weights point directly into the mapped file.
+    """
+    if use_numpy:
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("use_numpy requires numpy") from None
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    magic, version, flags, n, m, name_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a graph snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} in {path}")
+    if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError(f"{path} was written on a machine with a different byte order")
+    target_format = 'q' if flags & FLAG_WIDE_TARGETS else 'i'
+    position = HEADER.size + _padding(HEADER.size)
+
+    def section(format, count, itemsize):
+        nonlocal position
+        start = position
+        position += count * itemsize
+        position += _padding(position)
+        if use_numpy:
+            return np.frombuffer(buffer, dtype=format, count=count, offset=start)
+        return view[start:start + count * itemsize].cast(format)
+
+    name_offsets = view[position:position + 8 * (n + 1)].cast('q')
+    position += 8 * (n + 1)
+    name_data = view[position:position + name_size]
+    ids = NameTable(name_offsets, name_data)
+    position += name_size + _padding(name_size)
+    offsets = section('q', n + 1, 8)
+    targets = section(target_format, m, 4 if target_format == 'i' else 8)
+    weights = section('d', m, 8)
+    return CSRGraph(ids, offsets, targets, weights, bool(flags & FLAG_DIRECTED))
+
+def save_graphs(directory, graphs):
+    """
+    Writes several graphs to one snapshot directory, one file per graph.
+
+    Args:
+        directory (str): The directory to write to. It is created if needed.
+        graphs (dict): A dictionary mapping a name to a Graph or CSRGraph.
+
+    Returns:
+        None
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name, graph in graphs.items():
+        save_graph(graph, os.path.join(directory, name + EXTENSION))
+
+def load_graphs(directory, use_numpy=False):
+    """
+    Maps every snapshot file in a directory.
+
+    Args:
+        directory (str): The directory written by save_graphs.
+        use_numpy (bool): Expose the arrays as NumPy views instead of memoryviews.
+
+    Returns:
+        dict: A dictionary mapping each graph name to its CSRGraph.
+    """
+    graphs = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(EXTENSION):
+            graphs[file_name[:-len(EXTENSION)]] = load_graph(os.path.join(directory, file_name), use_numpy)
+    return graphs
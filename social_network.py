@@ -1,14 +1,34 @@
-import faker
+import heapq
 import random
 import operator
+import threading
+import time
+import instrumentation
 from graph import Graph
+from influence_matrix import compute_influence_matrix
+from ingest import load_events
+from leaderboard import EngagementLeaderboard, InfluenceLeaderboard
+from multiplex_graph import MultiplexGraph
+from name_pool import generate_names
+from path_cache import PathCache
+from snapshot import load_graphs, save_graphs
+from synthetic import generate_social_graphs
 
 names = []
 commentGraph = Graph()
 followGraph = Graph()
 likeGraph = Graph()
 influenceGraph = Graph()
-
+# The influence of v on u is not the influence of u on v, so influence edges are directed.
+influenceGraph.directed = True
+path_cache = PathCache(256)
+leaderboards = {}
+# Query threads may ask for a leaderboard at the same time, so only one of them builds it.
+_leaderboard_lock = threading.Lock()
+# The longest path calculate_highest_engagement_path searches for.
+MAX_ENGAGEMENT_HOPS = 64
+
+@instrumentation.timed()
 def calculate_influence(user_id1, user_id2):
     """
     Calculate the influence of user_id2 on user_id1 based on the number of likes and comments.
@@ -30,6 +50,7 @@ def calculate_influence(user_id1, user_id2):
         influence = 0
     return influence
 
+@instrumentation.timed()
 def calculate_engagement_rate(name):
     """
     Calculate the engagement rate for a given user.
@@ -49,38 +70,106 @@ def calculate_engagement_rate(name):
         engagement_rate = 0
     return engagement_rate
 
-def calculate_highest_engagement_path(start, destination):
+@instrumentation.timed()
+def calculate_highest_engagement_path(start, destination, max_hops=6, beam_width=64, time_budget=1.0):
     """
     Calculates the path with the highest engagement in a social network graph.
 
     The path represents the sequence of nodes from the starting node to the destination node
     that maximizes the overall engagement, which is calculated based on the number of likes and comments.
-    The total engagement is the sum of the engagement values of all nodes in the path.
-    
+    The total engagement is the sum of the engagement values of all nodes in the path after the start.
+
+    The search is a beam search over simple paths of at most max_hops edges in the influenceGraph.
+    It keeps the beam_width most engaging partial paths per hop and never revisits a node on a path.
+    A backwards BFS from the destination first finds which nodes can still reach it within the
+    remaining hops. Unreachable destinations therefore fail immediately, and dead ends are never
+    expanded. Engagement rates are computed at most once per node and query.
+
+    The time budget covers the whole call, including the backwards BFS, and is checked for every
+    node and partial path that is expanded. When it runs out before any path is found, TimeoutError
+    is raised, so (None, 0) always means that the search finished without finding a path.
+
     Args:
         start (str): The starting node of the path.
         destination (str): The destination node of the path.
+        max_hops (int): The maximum number of edges in the path, at most MAX_ENGAGEMENT_HOPS.
+        beam_width (int): The number of partial paths kept per hop.
+        time_budget (float): The number of seconds after which the best path found so far is returned.
 
     Returns:
-        tuple: A tuple containing the path (list of nodes) and the total engagement (int) of the path.
-    """
-    total_engagement = 0
-    current_node = start
-    path = [current_node]
-    while current_node != destination:
-        neighbors = influenceGraph.get_edges(current_node)
-        neighbor_engagement = {}
-        for neighbor in neighbors:
-            engagement = calculate_engagement_rate(neighbor)
-            neighbor_engagement[neighbor] = engagement
-        sorted_neighbors = sorted(neighbor_engagement.items(), key=operator.itemgetter(1), reverse=True)
-        next_node = sorted_neighbors[0][0]
-        next_engagement = sorted_neighbors[0][1]
-        total_engagement += next_engagement
-        path.append(next_node)
-        current_node = next_node
-    return path, total_engagement
+        tuple: A tuple containing the path (list of nodes) and the total engagement of the path,
+        or (None, 0) if no path was found.
+
+    Raises:
+        TimeoutError: If the time budget ran out before any path was found.
+    """
+    deadline = time.perf_counter() + time_budget
+    if start not in influenceGraph.vertices or destination not in influenceGraph.vertices:
+        return None, 0
+    if start == destination:
+        return [start], 0
+    # A simple path has fewer edges than the graph has nodes.
+    max_hops = min(max_hops, MAX_ENGAGEMENT_HOPS, len(influenceGraph.vertices) - 1)
+    hops_left = _hops_to_destination(destination, max_hops, deadline)
+    if start not in hops_left:
+        if time.perf_counter() > deadline:
+            # The backwards BFS was cut short, so start may still reach the destination.
+            raise TimeoutError(f"No path found within the time budget of {time_budget} seconds")
+        return None, 0
+    scores = {}
+    best_path, best_engagement = None, 0
+    beam = [(0, [start])]
+    for hop in range(1, max_hops + 1):
+        candidates = []
+        for total, path in beam:
+            if time.perf_counter() > deadline:
+                break
+            for neighbor in influenceGraph.get_edges(path[-1]):
+                if hops_left.get(neighbor, max_hops + 1) > max_hops - hop or neighbor in path:
+                    continue
+                if neighbor not in scores:
+                    scores[neighbor] = calculate_engagement_rate(neighbor)
+                engagement = total + scores[neighbor]
+                if neighbor == destination:
+                    if best_path is None or engagement > best_engagement:
+                        best_path, best_engagement = path + [neighbor], engagement
+                else:
+                    candidates.append((engagement, path + [neighbor]))
+        beam = heapq.nlargest(beam_width, candidates, key=operator.itemgetter(0))
+        if not beam:
+            break
+        if time.perf_counter() > deadline:
+            if best_path is None:
+                raise TimeoutError(f"No path found within the time budget of {time_budget} seconds")
+            break
+    return best_path, best_engagement
+
+def _hops_to_destination(destination, max_hops, deadline):
+    """
+    Finds every node that can reach the destination within max_hops edges of the influenceGraph.
+
+    If the deadline passes first, only the nodes found so far are returned.
 
+    Returns:
+        dict: The number of hops from each such node to the destination.
+    """
+    hops = {destination: 0}
+    frontier = [destination]
+    for hop in range(1, max_hops + 1):
+        next_frontier = []
+        for node in frontier:
+            if time.perf_counter() > deadline:
+                return hops
+            for source in influenceGraph.get_in_edges(node):
+                if source not in hops:
+                    hops[source] = hop
+                    next_frontier.append(source)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return hops
+
+@instrumentation.timed()
 def generate_influence_graph():
     """
     Generates an influence graph based on the social network data.
@@ -104,12 +193,34 @@ def generate_influence_graph():
                         total_influence = influence_likes + influence_comments
                         influenceGraph.add_edge(name, name_commented, total_influence)
 
+@instrumentation.timed()
+def generate_influence_graph_batch():
+    """
+    Generates the influence graph for every user at once.
+
+    The like, comment and follow graphs are exported as sparse matrices and the influence
+    of every liked or commented user is computed with row-normalized matrix operations
+    (see influence_matrix.compute_influence_matrix). The result is loaded into influenceGraph
+    with a single bulk add_edges call.
+
+    Returns:
+        CSRGraph: The computed influence graph.
+    """
+    influence = compute_influence_matrix(likeGraph, commentGraph, followGraph)
+    for name in influence.ids:
+        if name not in influenceGraph.vertices:
+            influenceGraph.add_vertex(name)
+    influenceGraph.add_edges(influence.edges())
+    return influence
+
 def generate_random_names():
     """
     Generates a list of random names and creates relationships between them in various graphs.
 
-    This function uses the Faker library to generate random names. It creates a list of 10 random names
-    and then adds these names to different graphs representing relationships in a social network.
+    This function uses the Faker library to generate random names, or the bundled name pool when Faker
+    is not installed. Faker is imported here rather than at startup because importing it is slow.
+    It creates a list of 10 random names and then adds these names to different graphs representing
+    relationships in a social network.
 
     The function creates relationships such as likes, follows, and comments between the names in the graphs.
     The number of likes, follows, and comments are randomly generated for each name.
@@ -117,9 +228,14 @@ def generate_random_names():
     Returns:
         None
     """
-    fake = faker.Faker()
-    for _ in range(10):
-        names.append(fake.name())
+    try:
+        import faker
+    except ImportError:
+        names.extend(generate_names(10, seed=random.randrange(2 ** 32)))
+    else:
+        fake = faker.Faker()
+        for _ in range(10):
+            names.append(fake.name())
     for name in names:
         commentGraph.add_vertex(name)
         followGraph.add_vertex(name)
@@ -140,6 +256,100 @@ def generate_random_names():
         for name_commented in commented_names:
             commentGraph.add_edge(name, name_commented, total_comments_per_name)
 
+@instrumentation.timed()
+def load_interaction_events(paths, chunk_size=100000, progress=None):
+    """
+    Loads likes, follows and comments from newline-delimited JSON or CSV event files.
+
+    The events are streamed in chunks of chunk_size and applied in bulk (see ingest.load_events).
+    Repeated likes and comments between the same users add to the edge weight. Users seen for
+    the first time are added to all four graphs and to the names list.
+
+    Parameters:
+        paths (list): The event files to load.
+        chunk_size (int): The number of events applied per batch.
+        progress (callable): Called with the running IngestStats after every batch.
+
+    Returns:
+        IngestStats: The number of events loaded and the throughput in events per second.
+    """
+    graphs = {'like': likeGraph, 'follow': followGraph, 'comment': commentGraph}
+    stats = load_events(paths, graphs, [commentGraph, followGraph, likeGraph, influenceGraph],
+                        chunk_size=chunk_size, progress=progress)
+    known = set(names)
+    names.extend(name for name in likeGraph.vertices if name not in known)
+    return stats
+
+@instrumentation.timed()
+def save_snapshot(directory):
+    """
+    Saves the four social graphs to a snapshot directory.
+
+    Parameters:
+        directory (str): The directory to write the snapshot files to.
+
+    Returns:
+        None
+    """
+    save_graphs(directory, {'comments': commentGraph, 'follows': followGraph,
+                            'likes': likeGraph, 'influence': influenceGraph})
+
+@instrumentation.timed()
+def load_snapshot(directory, compact=False):
+    """
+    Replaces the four social graphs with the graphs from a snapshot directory.
+
+    The snapshot files are memory-mapped and copied into mutable graphs. Read-only
+    users that do not need to modify the graphs can use snapshot.load_graphs directly.
+
+    Parameters:
+        directory (str): The directory written by save_snapshot.
+        compact (bool): Load the graphs in the compact representation, which needs much less memory.
+
+    Returns:
+        None
+    """
+    global commentGraph, followGraph, likeGraph, influenceGraph
+    graphs = load_graphs(directory)
+    commentGraph = graphs['comments'].thaw(compact)
+    followGraph = graphs['follows'].thaw(compact)
+    likeGraph = graphs['likes'].thaw(compact)
+    influenceGraph = graphs['influence'].thaw(compact)
+    names[:] = graphs['likes'].ids
+
+@instrumentation.timed()
+def generate_synthetic_network(n_users, average_degree=10, seed=0, distribution='power_law', compact=False,
+                               realistic_names=False):
+    """
+    Replaces the social graphs with a seeded synthetic network for load testing.
+
+    The like, follow and comment graphs are generated in bulk by synthetic.generate_social_graphs
+    and the influence graph is reset to the same users without edges.
+
+    Parameters:
+        n_users (int): The number of users.
+        average_degree (float): The expected number of likes, follows and comments created per user.
+        seed (int): The random seed.
+        distribution (str): 'power_law' or 'uniform'.
+        compact (bool): Build the graphs in the compact representation, which needs much less memory.
+        realistic_names (bool): Name the users with name_pool.generate_names instead of 'user0', 'user1', ...
+
+    Returns:
+        None
+    """
+    global commentGraph, followGraph, likeGraph, influenceGraph
+    ids = generate_names(n_users, seed) if realistic_names else None
+    graphs = generate_social_graphs(n_users, average_degree, seed, distribution, ids=ids)
+    commentGraph = graphs['comments'].thaw(compact)
+    followGraph = graphs['follows'].thaw(compact)
+    likeGraph = graphs['likes'].thaw(compact)
+    influenceGraph = Graph(compact)
+    influenceGraph.directed = True
+    for name in graphs['likes'].ids:
+        influenceGraph.add_vertex(name)
+    names[:] = graphs['likes'].ids
+
+@instrumentation.timed()
 def get_likes(name):
     """
     Calculates the total number of likes for a given name in the social network.
@@ -147,14 +357,15 @@ def get_likes(name):
     Parameters:
         name (str): The name for which to calculate the total likes.
 
+    The total is read from the aggregate index that likeGraph maintains as edges are
+    added or reweighted, so this is a constant time lookup.
+
     Returns:
         int: The total number of likes for the given name.
     """
-    total_likes = 0
-    for edge in likeGraph.get_edges(name):
-        total_likes += likeGraph.get_weight(name, edge)
-    return total_likes
+    return likeGraph.get_weighted_degree(name)
 
+@instrumentation.timed()
 def get_comments(name):
     """
     Get the total number of comments made by a user.
@@ -165,11 +376,87 @@ def get_comments(name):
     Returns:
         int: The total number of comments made by the user.
     """
-    total_comments = 0
-    for edge in commentGraph.get_edges(name):
-        total_comments += commentGraph.get_weight(name, edge)
-    return total_comments
+    return commentGraph.get_weighted_degree(name)
+
+@instrumentation.timed()
+def build_multiplex_graph():
+    """
+    Combines likeGraph, followGraph and commentGraph into one MultiplexGraph.
 
+    The multiplex graph stores every user and every pair of connected users once, with one
+    weight column per relation, and can run traversals over any combination of relations.
+
+    Returns:
+        MultiplexGraph: The combined graph with the relations 'likes', 'follows' and 'comments'.
+    """
+    return MultiplexGraph.from_graphs({'likes': likeGraph, 'follows': followGraph, 'comments': commentGraph})
+
+@instrumentation.timed()
+def calculate_engagement_rates(multiplex):
+    """
+    Calculates the engagement rate of every user in one pass over a multiplex graph.
+
+    Gives the same values as calculate_engagement_rate, read from the per-relation
+    aggregate arrays instead of three graphs per user.
+
+    Parameters:
+        multiplex (MultiplexGraph): The graph returned by build_multiplex_graph.
+
+    Returns:
+        dict: A dictionary mapping each user to their engagement rate.
+    """
+    likes = multiplex.degree['likes']
+    comments = multiplex.degree['comments']
+    follows = multiplex.counts['follows']
+    return {name: (likes[i] + comments[i]) / follows[i] if follows[i] != 0 else 0
+            for i, name in enumerate(multiplex.ids)}
+
+@instrumentation.timed()
+def top_influencers(k=100):
+    """
+    Returns the users with the highest total influence on others in the influenceGraph.
+
+    The ranking is kept up to date as influence edges change (see leaderboard.InfluenceLeaderboard),
+    so only the first call after the graphs are replaced ranks every user.
+
+    Parameters:
+        k (int): The number of users.
+
+    Returns:
+        list: Up to k (name, influence) tuples, highest influence first.
+    """
+    with _leaderboard_lock:
+        board = leaderboards.get('influence')
+        if board is None or board.graph is not influenceGraph:
+            if board is not None:
+                board.close()
+            board = leaderboards['influence'] = InfluenceLeaderboard(influenceGraph)
+    return board.top(k)
+
+@instrumentation.timed()
+def top_engaged_users(k=100):
+    """
+    Returns the users with the highest engagement rate.
+
+    The ranking is kept up to date as likes, comments and follows change
+    (see leaderboard.EngagementLeaderboard).
+
+    Parameters:
+        k (int): The number of users.
+
+    Returns:
+        list: Up to k (name, engagement rate) tuples, highest rate first.
+    """
+    with _leaderboard_lock:
+        board = leaderboards.get('engagement')
+        if (board is None or board.likes is not likeGraph or board.comments is not commentGraph
+                or board.follows is not followGraph):
+            if board is not None:
+                board.close()
+            board = leaderboards['engagement'] = EngagementLeaderboard(likeGraph, commentGraph, followGraph)
+    return board.top(k)
+
+@instrumentation.timed()
 def total_stats_display():
     """
     Display the total likes, follows, and comments for each user in the social network.
@@ -193,15 +480,16 @@ def total_stats_display():
         print(f"Total Follows: {len(names_followed)}")
         print(f"Total Comments: {get_comments(name)}\n")
 
+@instrumentation.timed()
 def influency_display():
     """
     Display the influence graph and weights for each edge.
 
-    This function generates the influence graph and prints the influence weights
+    This function generates the influence graph in batch mode and prints the influence weights
     for each edge in the graph. It iterates over each name in the 'names' list
     and prints the name followed by the edges and their corresponding weights.
     """
-    generate_influence_graph()
+    generate_influence_graph_batch()
     print("\nInfluence")
     for name in names:
         print(f"{name}:")
@@ -209,6 +497,7 @@ def influency_display():
             print(f"{edge}: {influenceGraph.get_weight(name, edge):.2f}")
         print()
 
+@instrumentation.timed()
 def engagement_rate_display():
     """
     Display the engagement rate for each name in the names list.
@@ -236,7 +525,7 @@ def shortest_follow_path_display():
     This function prompts the user to enter the start and destination vertices.
     It then checks if both vertices exist in the followGraph.
     If either of the vertices does not exist, it prints an error message and returns.
-    Otherwise, it performs a breadth-first search (BFS) on the followGraph starting from the start vertex.
+    Otherwise, it performs a bidirectional breadth-first search (BFS) between the two vertices in the followGraph.
     Finally, it prints the shortest path between the start and destination vertices.
 
     Returns:
@@ -246,9 +535,7 @@ def shortest_follow_path_display():
     if start not in followGraph.vertices or destination not in followGraph.vertices:
         print("One or both of the entered names do not exist in the graph. Please try again.")
         return
-    followGraph.bfs(start)
-    followGraph.print_shortest_path(start, destination)
-    print(f"{followGraph.path}\n")
+    print_path(find_shortest_path(followGraph, start, destination), "Hops")
 
 def shortest_like_path_display():
     """
@@ -256,7 +543,7 @@ def shortest_like_path_display():
 
     This function prompts the user to enter the start and destination vertices.
     It then checks if both vertices exist in the likeGraph. If not, it prints an error message and returns.
-    If both vertices exist, it performs a breadth-first search (BFS) on the likeGraph starting from the start vertex.
+    If both vertices exist, it performs a bidirectional breadth-first search (BFS) between them in the likeGraph.
     Finally, it prints the shortest path between the start and destination vertices.
 
     Note: The likeGraph object must be defined and initialized before calling this function.
@@ -268,15 +555,13 @@ def shortest_like_path_display():
     if start not in likeGraph.vertices or destination not in likeGraph.vertices:
         print("One or both of the entered names do not exist in the graph. Please try again.")
         return
-    likeGraph.bfs(start)
-    likeGraph.print_shortest_path(start, destination)
-    print(f"{likeGraph.path}\n")
+    print_path(find_shortest_path(likeGraph, start, destination), "Hops")
 
 def shortest_comment_path_display():
     """
     Finds and displays the shortest path between two users in a comment graph.
 
-    This function prompts the user to enter the start and destination users, then uses a breadth-first search algorithm
+    This function prompts the user to enter the start and destination users, then uses a bidirectional breadth-first search
     to find the shortest path between them in the comment graph. If either the start or destination user does not exist
     in the graph, an error message is displayed. Otherwise, the shortest path is printed.
 
@@ -287,12 +572,64 @@ def shortest_comment_path_display():
         None
     """
     start, destination = get_start_and_destination()
-    commentGraph.bfs(start)
     if start not in commentGraph.vertices or destination not in commentGraph.vertices:
         print("One or both of the entered names do not exist in the graph. Please try again.")
         return
-    commentGraph.print_shortest_path(start, destination)
-    print(f"{commentGraph.path}\n")
+    print_path(find_shortest_path(commentGraph, start, destination), "Hops")
+
+@instrumentation.timed()
+def find_shortest_path(graph, start, destination):
+    """
+    Finds a fewest-hop path, reusing a cached BFS tree from the start when there is one.
+
+    A one-off query runs a bidirectional BFS, which only explores around both ends. Once the same
+    start is asked for again, a full BFS tree from it is computed and cached in path_cache, so
+    further queries from that start are answered from the tree.
+
+    Parameters:
+        graph (Graph): The graph to search.
+        start (str): The starting name.
+        destination (str): The destination name.
+
+    Returns:
+        Path: The path, or None if there is no path.
+    """
+    if start not in graph.vertices or destination not in graph.vertices:
+        return None
+    paths = path_cache.frequent(graph, 'bfs', start)
+    if paths is not None:
+        return paths.path_to(destination)
+    return graph.bidirectional_bfs(start, destination)
+
+def print_path(path, label):
+    """
+    Prints the names along a path followed by its cost.
+
+    Parameters:
+        path (Path): The path to print, or None if there is no path.
+        label (str): The name printed in front of the path cost.
+
+    Returns:
+        None
+    """
+    if path is None:
+        print("No path from start to dest\n")
+        return
+    print(' '.join(str(name) for name in path))
+    print(f"{label}: {path.cost}\n")
+
+def print_engagement_path(paths, destination):
+    """
+    Prints the path to a destination and its total weight from a Dijkstra result.
+
+    Parameters:
+        paths (ShortestPaths): The result of a Dijkstra search.
+        destination (str): The destination name.
+
+    Returns:
+        None
+    """
+    print_path(paths.path_to(destination), "Engagement")
 
 def display_engagement_path_for_follows():
     """
@@ -309,9 +646,11 @@ def display_engagement_path_for_follows():
         None
     """
     start, destination = get_start_and_destination()
-    followGraph.dijkstra(start)
-    followGraph.print_shortest_path(start, destination)
-    print(f"{followGraph.path}\n")
+    if start not in followGraph.vertices or destination not in followGraph.vertices:
+        print("One or both of the entered names do not exist in the graph. Please try again.")
+        return
+    paths = path_cache.dijkstra(followGraph, start)
+    print_engagement_path(paths, destination)
 
 def display_engagement_path_for_likes():
     """
@@ -326,9 +665,11 @@ def display_engagement_path_for_likes():
         None
     """
     start, destination = get_start_and_destination()
-    likeGraph.dijkstra(start)
-    likeGraph.print_shortest_path(start, destination)
-    print(f"{likeGraph.path}\n")
+    if start not in likeGraph.vertices or destination not in likeGraph.vertices:
+        print("One or both of the entered names do not exist in the graph. Please try again.")
+        return
+    paths = path_cache.dijkstra(likeGraph, start)
+    print_engagement_path(paths, destination)
 
 def display_engagement_path_for_comments():
     """
@@ -345,9 +686,11 @@ def display_engagement_path_for_comments():
     None
     """
     start, destination = get_start_and_destination()
-    commentGraph.dijkstra(start)
-    commentGraph.print_shortest_path(start, destination)
-    print(f"\n{commentGraph.path}\n")
+    if start not in commentGraph.vertices or destination not in commentGraph.vertices:
+        print("One or both of the entered names do not exist in the graph. Please try again.")
+        return
+    paths = path_cache.dijkstra(commentGraph, start)
+    print_engagement_path(paths, destination)
 
 def main_menu():
     while True:
@@ -386,7 +729,7 @@ def engagement_path_display():
         elif choice == "3":
             commentGraph.display_edges()
             display_engagement_path_for_comments()
-        elif choice == "4": main_menu()
+        elif choice == "4": return
         else: print("Invalid choice. Please try again.")
 
 def shortest_path_display():
@@ -408,7 +751,7 @@ def shortest_path_display():
         elif choice == "3":
             commentGraph.display_edges()
             shortest_comment_path_display()
-        elif choice == "4": main_menu()
+        elif choice == "4": return
         else: print("Invalid choice. Please try again.")
 
 def main():
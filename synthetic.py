@@ -0,0 +1,118 @@
+"""
+Seeded synthetic social graphs for load testing and benchmarks.
+
+Edges follow an expected-degree (Chung-Lu) model. Every user draws an activity,
+which sets how many edges they create, and a popularity, which sets how likely
+they are to receive one. With the 'power_law' distribution both come from a
+Pareto distribution, which gives the heavy-tailed in-degrees that preferential
+attachment produces in real follow graphs. With 'uniform' every user is alike.
+
+When NumPy is installed the edges are drawn with vectorized NumPy calls and the
+graphs are built with CSRGraph.from_arrays. Otherwise the standard library random
+module is used. Both backends are deterministic for a given seed, but they do not
+produce the same graphs as each other.
+"""
+import random
+from csr_graph import CSRGraph, load_numpy
+
+RELATIONS = ('likes', 'follows', 'comments')
+
+def generate_edges(n_users, average_degree, seed=None, distribution='power_law', exponent=2.1, max_weight=10):
+    """
+    Draws the edges of one relation.
+
+    Args:
+        n_users (int): The number of users.
+        average_degree (float): The expected number of edges created per user.
+        seed (int): The random seed.
+        distribution (str): 'power_law' or 'uniform'.
+        exponent (float): The power-law exponent of the activity and popularity distributions.
+        max_weight (int): Weights are drawn uniformly from 1..max_weight. Use 1 for unweighted relations.
+
+    Returns:
+        tuple: Parallel sequences (sources, targets, weights) of interned user ids, without self loops.
+    """
+    if distribution not in ('power_law', 'uniform'):
+        raise ValueError(f"Unknown degree distribution: {distribution}")
+    if n_users < 2:
+        return [], [], []
+    np = load_numpy()
+    if np is not None:
+        return _generate_edges_numpy(np, n_users, average_degree, seed, distribution, exponent, max_weight)
+    return _generate_edges_python(n_users, average_degree, seed, distribution, exponent, max_weight)
+
+def _generate_edges_numpy(np, n_users, average_degree, seed, distribution, exponent, max_weight):
+    rng = np.random.default_rng(seed)
+    if distribution == 'power_law':
+        activity = rng.pareto(exponent - 1, n_users) + 1
+        popularity = rng.pareto(exponent - 1, n_users) + 1
+    else:
+        activity = np.ones(n_users)
+        popularity = np.ones(n_users)
+    degrees = rng.poisson(activity * (average_degree / activity.mean()))
+    sources = np.repeat(np.arange(n_users, dtype=np.int64), degrees)
+    # Targets are drawn independently of sources, so draw how often each user is a
+    # target and shuffle, which is much faster than sampling one target at a time.
+    counts = rng.multinomial(len(sources), popularity / popularity.sum())
+    targets = np.repeat(np.arange(n_users, dtype=np.int64), counts)
+    rng.shuffle(targets)
+    keep = sources != targets
+    sources = sources[keep]
+    targets = targets[keep]
+    weights = rng.integers(1, max_weight + 1, size=len(sources)).astype(np.float64)
+    return sources, targets, weights
+
+def _generate_edges_python(n_users, average_degree, seed, distribution, exponent, max_weight):
+    rng = random.Random(seed)
+    if distribution == 'power_law':
+        activity = [rng.paretovariate(exponent - 1) for _ in range(n_users)]
+        popularity = [rng.paretovariate(exponent - 1) for _ in range(n_users)]
+    else:
+        activity = [1.0] * n_users
+        popularity = [1.0] * n_users
+    scale = average_degree * n_users / sum(activity)
+    sources = []
+    for user, value in enumerate(activity):
+        expected = value * scale
+        degree = int(expected) + (rng.random() < expected - int(expected))
+        sources.extend([user] * degree)
+    cumulative = []
+    total = 0.0
+    for value in popularity:
+        total += value
+        cumulative.append(total)
+    targets = rng.choices(range(n_users), cum_weights=cumulative, k=len(sources))
+    edges = [(source, target) for source, target in zip(sources, targets) if source != target]
+    weights = [rng.randint(1, max_weight) for _ in edges]
+    return [source for source, _ in edges], [target for _, target in edges], weights
+
+def generate_social_graphs(n_users, average_degree=10, seed=0, distribution='power_law', exponent=2.1,
+                           directed=False, ids=None):
+    """
+    Generates like, follow and comment graphs over one set of users.
+
+    Likes and comments get weights from 1 to 10, follows a weight of 1. Each relation is
+    drawn with its own seed derived from seed, so the result only depends on the arguments.
+
+    Args:
+        n_users (int): The number of users.
+        average_degree (float): The expected number of edges created per user in each relation.
+        seed (int): The random seed.
+        distribution (str): 'power_law' or 'uniform'.
+        exponent (float): The power-law exponent.
+        directed (bool): Whether the generated graphs are directed.
+        ids (list): The user names. Defaults to 'user0', 'user1', ...
+
+    Returns:
+        dict: A dictionary mapping 'likes', 'follows' and 'comments' to a CSRGraph.
+    """
+    if ids is None:
+        ids = [f"user{i}" for i in range(n_users)]
+    graphs = {}
+    for offset, relation in enumerate(RELATIONS):
+        max_weight = 1 if relation == 'follows' else 10
+        relation_seed = None if seed is None else seed * len(RELATIONS) + offset
+        sources, targets, weights = generate_edges(n_users, average_degree, relation_seed,
+                                                   distribution, exponent, max_weight)
+        graphs[relation] = CSRGraph.from_arrays(ids, sources, targets, weights, directed)
+    return graphs
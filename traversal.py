@@ -0,0 +1,165 @@
+"""
+Stateless traversals over a read-only CSRGraph.
+
+Every function keeps its per-query state in dense arrays indexed by interned
+vertex id and never writes to the graph, so any number of threads can run
+queries against one shared CSRGraph at the same time, e.g.:
+
+    frozen = followGraph.freeze()
+    with ThreadPoolExecutor() as executor:
+        paths = list(executor.map(lambda q: shortest_path(frozen, *q), queries))
+"""
+import heapq
+from array import array
+from collections import deque
+from shortest_paths import CSRShortestPaths
+
+def bfs(graph, start, target=None):
+    """
+    Performs breadth-first search over a CSRGraph.
+
+    Args:
+        graph (CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        target (any): Optional vertex at which the search stops once it is reached.
+
+    Returns:
+        CSRShortestPaths: Hop distances and parents, or None if start is not in the graph.
+    """
+    if start not in graph.index:
+        print("Starting vertex not found")
+        return None
+    offsets = graph.offsets
+    targets = graph.targets
+    s = graph.index[start]
+    t = graph.index.get(target, -1)
+    distances = array('q', [-1]) * len(graph.ids)
+    parents = array('q', [-1]) * len(graph.ids)
+    distances[s] = 0
+    queue = deque([s])
+    while queue:
+        u = queue.popleft()
+        if u == t:
+            break
+        next_distance = distances[u] + 1
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if distances[v] < 0:
+                distances[v] = next_distance
+                parents[v] = u
+                queue.append(v)
+    return CSRShortestPaths(graph, start, distances, parents, -1)
+
+def dijkstra(graph, start, target=None):
+    """
+    Performs Dijkstra's algorithm over a CSRGraph.
+
+    Args:
+        graph (CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        target (any): Optional vertex at which the search stops once it is settled. Only the vertices
+            settled by then keep their distances.
+
+    Returns:
+        CSRShortestPaths: Distances and parents, or None if start is not in the graph.
+    """
+    if start not in graph.index:
+        print(f"Vertex {start} not found in the graph.")
+        return None
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    inf = float('inf')
+    s = graph.index[start]
+    t = graph.index.get(target, -1)
+    distances = array('d', [inf]) * len(graph.ids)
+    parents = array('q', [-1]) * len(graph.ids)
+    distances[s] = 0
+    heap = [(0, s)]
+    while heap:
+        distance, u = heapq.heappop(heap)
+        if distance > distances[u]:
+            continue
+        if u == t:
+            # Vertices still queued at their current distance are not settled yet; reset them.
+            for queued, v in heap:
+                if distances[v] == queued:
+                    distances[v] = inf
+                    parents[v] = -1
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            new_distance = distance + weights[k]
+            if new_distance < distances[v]:
+                distances[v] = new_distance
+                parents[v] = u
+                heapq.heappush(heap, (new_distance, v))
+    return CSRShortestPaths(graph, start, distances, parents, inf)
+
+def astar(graph, start, destination, landmarks):
+    """
+    Finds the shortest weighted path between two vertices of a CSRGraph with A* search.
+
+    Args:
+        graph (CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        destination (any): The identifier of the destination vertex.
+        landmarks (LandmarkIndex): Landmark distance tables built for this graph.
+
+    Returns:
+        Path: The path and its cost, or None if either vertex is missing or there is no path.
+    """
+    if start not in graph.index or destination not in graph.index:
+        return None
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    lower_bound = landmarks.lower_bound
+    inf = float('inf')
+    s = graph.index[start]
+    t = graph.index[destination]
+    distances = array('d', [inf]) * len(graph.ids)
+    parents = array('q', [-1]) * len(graph.ids)
+    distances[s] = 0
+    bounds = {}
+    heap = [(lower_bound(s, t), 0, s)]
+    while heap:
+        _, distance, u = heapq.heappop(heap)
+        if distance > distances[u]:
+            continue
+        if u == t:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            new_distance = distance + weights[k]
+            if new_distance < distances[v]:
+                bound = bounds.get(v)
+                if bound is None:
+                    bound = bounds[v] = lower_bound(v, t)
+                if bound == inf:
+                    continue
+                distances[v] = new_distance
+                parents[v] = u
+                heapq.heappush(heap, (new_distance + bound, new_distance, v))
+    return CSRShortestPaths(graph, start, distances, parents, inf).path_to(destination)
+
+def shortest_path(graph, start, destination, weighted=False):
+    """
+    Finds the shortest path between two vertices of a CSRGraph.
+
+    Args:
+        graph (CSRGraph): The graph to search.
+        start (any): The identifier of the starting vertex.
+        destination (any): The identifier of the destination vertex.
+        weighted (bool): Use Dijkstra's algorithm instead of breadth-first search.
+
+    Returns:
+        Path: The path and its cost, or None if either vertex is missing or there is no path.
+    """
+    if start not in graph.index or destination not in graph.index:
+        return None
+    if weighted:
+        paths = dijkstra(graph, start, destination)
+    else:
+        paths = bfs(graph, start, destination)
+    return paths.path_to(destination)
@@ -1,3 +1,7 @@
+import sys
+from collections.abc import Mapping
+from edge import Edge
+
 class Vertex:
     """
     Represents a vertex in a graph.
@@ -10,6 +14,8 @@ class Vertex:
         parent (Vertex): The parent vertex in a path (used in graph algorithms).
     """
 
+    __slots__ = ('id', 'edges', 'data', 'distance', 'parent')
+
     def __init__(self, id, data=None):
         self.id = id
         self.edges = {}
@@ -30,6 +36,36 @@ class Vertex:
         """
         self.edges[idb] = edge
 
+    def get_weight(self, idb):
+        """
+        Returns the weight of the edge to a vertex.
+
+        Args:
+            idb (any): The identifier of the connected vertex.
+
+        Returns:
+            number: The weight, or None if there is no such edge.
+        """
+        edge = self.edges.get(idb)
+        return edge.weight if edge is not None else None
+
+    def set_weight(self, idb, weight):
+        """
+        Sets the weight of the edge to a vertex, adding the edge if it does not exist.
+
+        Args:
+            idb (any): The identifier of the vertex to connect the edge to.
+            weight (number): The weight of the edge.
+
+        Returns:
+            None
+        """
+        edge = self.edges.get(idb)
+        if edge is None:
+            self.edges[idb] = Edge(idb, weight)
+        else:
+            edge.weight = weight
+
     def init_bfs(self):
         """
         Initializes the vertex for breadth-first search (BFS).
@@ -40,4 +76,107 @@ class Vertex:
             None
         """
         self.distance = float('inf')
-        self.parent = None
\ No newline at end of file
+        self.parent = None
+
+
+class CompactVertex:
+    """
+    Represents a vertex of a compact graph.
+
+    The edges are stored as a dictionary mapping each connected vertex to the edge weight,
+    without Edge objects, and the vertex has no traversal state.
+
+    Attributes:
+        id (any): The unique identifier of the vertex.
+        weights (dict): A dictionary mapping each connected vertex to the weight of the edge.
+        data (any): Optional data associated with the vertex.
+        edges (EdgeView): A read-only view of the edges as Edge objects, for code written for Vertex.
+    """
+
+    __slots__ = ('id', 'weights', 'data')
+
+    def __init__(self, id, data=None):
+        self.id = id
+        self.weights = {}
+        self.data = data
+
+    @property
+    def edges(self):
+        return EdgeView(self.weights)
+
+    def add_edge(self, idb, edge):
+        """
+        Adds an edge to the vertex. Only the weight of the edge is kept.
+
+        Args:
+            idb (any): The identifier of the vertex to connect the edge to.
+            edge (Edge): The edge object to add.
+
+        Returns:
+            None
+        """
+        self.weights[idb] = edge.weight
+
+    def get_weight(self, idb):
+        """
+        Returns the weight of the edge to a vertex.
+
+        Args:
+            idb (any): The identifier of the connected vertex.
+
+        Returns:
+            number: The weight, or None if there is no such edge.
+        """
+        return self.weights.get(idb)
+
+    def set_weight(self, idb, weight):
+        """
+        Sets the weight of the edge to a vertex, adding the edge if it does not exist.
+
+        Args:
+            idb (any): The identifier of the vertex to connect the edge to.
+            weight (number): The weight of the edge.
+
+        Returns:
+            None
+        """
+        self.weights[idb] = weight
+
+
+class EdgeView(Mapping):
+    """
+    A read-only mapping of destination to Edge over a dictionary of destination to weight.
+
+    Edge objects are created when they are looked up, so changing their weight does not
+    change the graph; use Graph.set_weight instead.
+    """
+
+    __slots__ = ('_weights',)
+
+    def __init__(self, weights):
+        self._weights = weights
+
+    def __getitem__(self, idb):
+        return Edge(idb, self._weights[idb])
+
+    def __contains__(self, idb):
+        return idb in self._weights
+
+    def __iter__(self):
+        return iter(self._weights)
+
+    def __len__(self):
+        return len(self._weights)
+
+
+def intern_id(id):
+    """
+    Returns the shared copy of a string identifier so every reference to it uses one object.
+
+    Args:
+        id (any): The identifier. Identifiers that are not strings are returned unchanged.
+
+    Returns:
+        any: The interned identifier.
+    """
+    return sys.intern(id) if type(id) is str else id